@@ -0,0 +1,127 @@
+import asyncio
+import functools
+from concurrent.futures.thread import ThreadPoolExecutor
+from typing import Final, List, Optional, Callable, Any
+
+from gmail_fisher import get_logger
+from gmail_fisher.api.gateway import GmailGateway, DEFAULT_FETCH_PROFILE
+from gmail_fisher.data.message_cache import MessageCache
+from gmail_fisher.data.models import GmailMessage, FetchProfile
+from gmail_fisher.utils.config import (
+    ASYNC_GATEWAY_MAX_CONCURRENCY,
+    MESSAGE_CACHE_ENABLED,
+)
+
+logger = get_logger(__name__)
+
+
+class AsyncGmailGateway:
+    """
+    Coroutine counterpart of GmailGateway, safe to await from an event loop. Gmail API
+    calls run on a small shared executor whose threads each keep one keep-alive transport,
+    which also bounds the requests in flight across all callers to the size of the pool.
+    """
+
+    __executor: Final[ThreadPoolExecutor] = ThreadPoolExecutor(
+        max_workers=ASYNC_GATEWAY_MAX_CONCURRENCY, thread_name_prefix="gmail-async"
+    )
+
+    @classmethod
+    async def list_message_ids(
+        cls,
+        sender_emails: str,
+        keywords: str,
+        max_results: Optional[int] = None,
+        page_token: Optional[str] = None,
+    ) -> List[str]:
+        return await cls.__run(
+            GmailGateway.list_message_ids,
+            sender_emails,
+            keywords,
+            max_results,
+            page_token,
+        )
+
+    @classmethod
+    async def get_email_messages(
+        cls,
+        sender_emails: str,
+        keywords: str,
+        max_results: Optional[int] = None,
+        fetch_body: bool = False,
+        profile: FetchProfile = DEFAULT_FETCH_PROFILE,
+        use_cache: bool = MESSAGE_CACHE_ENABLED,
+    ) -> List[GmailMessage]:
+        """
+        Fetches the messages matching the sender and keywords, scheduling the detail
+        fetches of each page of message IDs as soon as the page is listed.
+        """
+        if fetch_body and not profile.includes_body:
+            raise ValueError(
+                f"Cannot fetch message body with {profile.format=}, use 'full' or 'raw'"
+            )
+
+        cache_key = GmailGateway.message_cache_key(profile, fetch_body)
+        cached_messages, message_ids, tasks = [], [], []
+
+        pages = GmailGateway.iter_message_id_pages(sender_emails, keywords, max_results)
+        while (page := await cls.__run(next, pages, None)) is not None:
+            missing_ids = page.message_ids
+            if use_cache:
+                cached = await cls.__run(
+                    MessageCache.get_instance().get_many, page.message_ids, cache_key
+                )
+                cached_messages.extend(cached.values())
+                missing_ids = [
+                    message_id
+                    for message_id in page.message_ids
+                    if message_id not in cached
+                ]
+            message_ids.extend(missing_ids)
+            tasks.extend(
+                asyncio.create_task(
+                    cls.get_message_detail(message_id, fetch_body, profile)
+                )
+                for message_id in missing_ids
+            )
+
+        results = []
+        for message_id, result in zip(
+            message_ids, await asyncio.gather(*tasks, return_exceptions=True)
+        ):
+            if isinstance(result, Exception):
+                logger.error(f"Error fetching message with {message_id=}: {result}")
+            else:
+                results.append(result)
+
+        if use_cache:
+            await cls.__run(MessageCache.get_instance().put_many, results, cache_key)
+
+        logger.success(
+            f"Successfully fetched {len(results) + len(cached_messages)} emails from Gmail API "
+            f"from {sender_emails=} and {keywords=}"
+        )
+        return cached_messages + results
+
+    @classmethod
+    async def get_message_detail(
+        cls,
+        message_id: str,
+        fetch_body: bool,
+        profile: FetchProfile = DEFAULT_FETCH_PROFILE,
+    ) -> GmailMessage:
+        return await cls.__run(
+            GmailGateway.get_message_detail, message_id, fetch_body, profile
+        )
+
+    @classmethod
+    async def get_message_attachment(cls, message_id: str, attachment_id: str) -> str:
+        return await cls.__run(
+            GmailGateway.get_message_attachment, message_id, attachment_id
+        )
+
+    @classmethod
+    async def __run(cls, func: Callable[..., Any], *args) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(
+            cls.__executor, functools.partial(func, *args)
+        )
@@ -1,9 +1,17 @@
 import base64
 import concurrent
+import email
+import email.policy
+import email.utils
 import os
+import queue
+import threading
+import time
 from concurrent.futures.thread import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Iterable, Final, List, Any, Dict
+from typing import Iterable, Iterator, Final, List, Any, Dict, Optional, Tuple, Set
 
 import google_auth_httplib2
 import httplib2
@@ -12,41 +20,119 @@ from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build, Resource
+from googleapiclient.errors import HttpError
+from googleapiclient.http import HttpRequest
 
 from gmail_fisher import get_logger
+from gmail_fisher.api.scheduler import (
+    AdaptiveScheduler,
+    is_rate_limit_error,
+    is_transient_error,
+)
 from gmail_fisher.utils.config import (
     AUTH_PATH,
+    BATCH_REQUEST_MAX_RETRIES,
+    BATCH_REQUEST_MAX_SIZE,
+    MESSAGE_BATCH_SIZE,
     GMAIL_READ_ONLY_SCOPE,
+    LIST_MESSAGES_PAGE_SIZE,
+    MESSAGE_CACHE_ENABLED,
+    STREAM_QUEUE_MAX_SIZE,
+    INCREMENTAL_SYNC_ENABLED,
+    INCREMENTAL_SYNC_MARGIN_SECONDS,
+    GMAIL_QUOTA_UNITS,
     THREAD_POOL_MAX_WORKERS,
 )
-from gmail_fisher.data.models import GmailMessage, MessageAttachment
+from gmail_fisher.data.message_cache import MessageCache
+from gmail_fisher.data.sync_state import SyncStateStore, SyncState
+from gmail_fisher.data.models import GmailMessage, MessageAttachment, FetchProfile
 
 logger = get_logger(__name__)
 
+DEFAULT_FETCH_PROFILE: Final[FetchProfile] = FetchProfile()
+STREAM_POLL_SECONDS: Final[float] = 0.1
+
+
+@dataclass
+class MessageIdPage:
+    message_ids: List[str]
+    next_page_token: Optional[str] = None
+
+
+@dataclass
+class TransportStats:
+    connections_opened: int = 0
+    connections_reused: int = 0
+
 
 class GmailClient:
     scopes: List[str] = [GMAIL_READ_ONLY_SCOPE]
     credentials_path: Final[Path] = AUTH_PATH / "credentials.json"
     token_json_path: Final[Path] = AUTH_PATH / "auth_token.json"
     __instance: Resource = None
+    __credentials: Optional[Credentials] = None
+    __credentials_lock: Final[threading.Lock] = threading.Lock()
+    __transports: Final[threading.local] = threading.local()
+    __stats: TransportStats = TransportStats()
+    __stats_lock: Final[threading.Lock] = threading.Lock()
 
     @classmethod
     def auth_http_request(cls) -> google_auth_httplib2.AuthorizedHttp:
-        return google_auth_httplib2.AuthorizedHttp(
-            cls.__authenticate(), http=httplib2.Http()
-        )
+        """
+        Returns the keep-alive authorized transport bound to the calling thread, creating
+        it on first use. All transports share the same in-memory credentials.
+        """
+        credentials = cls.get_credentials()
+        http = getattr(cls.__transports, "http", None)
+        if http is None:
+            http = google_auth_httplib2.AuthorizedHttp(
+                credentials, http=httplib2.Http()
+            )
+            cls.__transports.http = http
+            cls.__record_connection(reused=False)
+        else:
+            http.credentials = credentials
+            cls.__record_connection(reused=True)
+        return http
 
     @classmethod
     def get_instance(cls) -> Resource:
         if not cls.__instance:
-            credentials = cls.__authenticate()
-            cls.__instance = build("gmail", "v1", credentials=credentials)
+            cls.__instance = build("gmail", "v1", credentials=cls.get_credentials())
         return cls.__instance
 
     @classmethod
-    def __authenticate(cls) -> Credentials:
-        credentials = None
-        if os.path.exists(cls.token_json_path):
+    def get_credentials(cls) -> Credentials:
+        """
+        Returns the credentials kept in memory, loading them from the token file only once
+        and refreshing them under a lock so concurrent workers never refresh twice.
+        """
+        with cls.__credentials_lock:
+            if not cls.__credentials or not cls.__credentials.valid:
+                cls.__credentials = cls.__authenticate(cls.__credentials)
+            return cls.__credentials
+
+    @classmethod
+    def get_transport_stats(cls) -> TransportStats:
+        with cls.__stats_lock:
+            return replace(cls.__stats)
+
+    @classmethod
+    def reset_transport_stats(cls):
+        with cls.__stats_lock:
+            cls.__stats = TransportStats()
+
+    @classmethod
+    def __record_connection(cls, reused: bool):
+        with cls.__stats_lock:
+            if reused:
+                cls.__stats.connections_reused += 1
+            else:
+                cls.__stats.connections_opened += 1
+
+    @classmethod
+    def __authenticate(cls, credentials: Optional[Credentials] = None) -> Credentials:
+        if not credentials and os.path.exists(cls.token_json_path):
             with open(cls.token_json_path, "rb") as token:
                 credentials = Credentials.from_authorized_user_file(
                     str(cls.token_json_path), cls.scopes
@@ -67,100 +153,565 @@ class GmailClient:
 class GmailGateway:
     """Maximum number of workers for thread pool executor"""
 
+    @staticmethod
+    def build_query(sender_emails: str, keywords: str) -> str:
+        return f"from:{sender_emails} {keywords}"
+
     @classmethod
     def list_message_ids(
-        cls, sender_emails: str, keywords: str, max_results: int
+        cls,
+        sender_emails: str,
+        keywords: str,
+        max_results: Optional[int] = None,
+        page_token: Optional[str] = None,
     ) -> Iterable[str]:
         """
         For a given sender email and comma-separated keywords, retrieve the matching
         message IDs and return them as a list.
         """
+        return [
+            message_id
+            for page in GmailGateway.iter_message_id_pages(
+                sender_emails, keywords, max_results, page_token
+            )
+            for message_id in page.message_ids
+        ]
+
+    @classmethod
+    def iter_message_id_pages(
+        cls,
+        sender_emails: str,
+        keywords: str,
+        max_results: Optional[int] = None,
+        page_token: Optional[str] = None,
+    ) -> Iterator[MessageIdPage]:
+        """
+        Lazily lists the matching message IDs one page at a time, following 'nextPageToken'
+        until there are no pages left or 'max_results' IDs were listed. Each page carries
+        the token from which a later call can resume listing.
+        """
         logger.info(f"Fetching emails with {sender_emails=}, {keywords=}")
-        list_message_results = (
-            GmailClient.get_instance()
-            .users()
-            .messages()
-            .list(
-                userId="me",
-                q=f"from:{sender_emails} {keywords}",
-                maxResults=max_results,
+        messages_api = GmailClient.get_instance().users().messages()
+        num_listed = 0
+
+        while max_results is None or num_listed < max_results:
+            page_size = LIST_MESSAGES_PAGE_SIZE
+            if max_results is not None:
+                page_size = min(page_size, max_results - num_listed)
+
+            list_message_results = GmailGateway.execute(
+                "messages.list",
+                messages_api.list(
+                    userId="me",
+                    q=GmailGateway.build_query(sender_emails, keywords),
+                    maxResults=page_size,
+                    pageToken=page_token,
+                ),
             )
-            .execute(http=GmailClient.auth_http_request())
-        )
 
-        if list_message_results["resultSizeEstimate"] == 0:
+            message_ids = [
+                message["id"] for message in list_message_results.get("messages", [])
+            ]
+            page_token = list_message_results.get("nextPageToken")
+            num_listed += len(message_ids)
+            if message_ids:
+                yield MessageIdPage(message_ids=message_ids, next_page_token=page_token)
+            if not page_token:
+                break
+
+        if num_listed == 0:
             logger.warning(
                 f"No messages found for email='{sender_emails}', keywords='{keywords}'"
             )
-            return []
         else:
-            message_ids = [
-                message["id"] for message in list_message_results["messages"]
-            ]
-            logger.info(
-                f"Found {len(message_ids)} emails for {sender_emails=}, {keywords=}"
+            logger.info(f"Found {num_listed} emails for {sender_emails=}, {keywords=}")
+        if page_token:
+            logger.warning(
+                f"Stopped listing at {max_results=}, resume with {page_token=}"
             )
-            return message_ids
+
+    @classmethod
+    def list_message_ids_incremental(
+        cls, sender_emails: str, keywords: str
+    ) -> List[str]:
+        """
+        Lists the message IDs matching the sender and keywords using the sync state of the
+        previous run, so only messages added to the mailbox since then are listed. Falls
+        back to a full listing on the first run or when the stored history ID expired.
+        """
+        query = GmailGateway.build_query(sender_emails, keywords)
+        sync_store = SyncStateStore.get_instance()
+        previous_state = sync_store.get(query)
+        # Read before listing so messages arriving meanwhile are picked up next run
+        history_id = GmailGateway.get_current_history_id()
+        synced_at = time.time()
+
+        message_ids = None
+        if previous_state:
+            try:
+                message_ids = (
+                    GmailGateway.__list_new_message_ids(
+                        sender_emails, keywords, previous_state
+                    )
+                    + previous_state.message_ids
+                )
+            except HttpError as ex:
+                if ex.resp.status != 404:
+                    raise
+                logger.warning(
+                    f"History ID {previous_state.history_id} expired for {query=}, "
+                    f"falling back to full listing"
+                )
+        if message_ids is None:
+            message_ids = GmailGateway.list_message_ids(sender_emails, keywords)
+
+        message_ids = list(dict.fromkeys(message_ids))
+        sync_store.put(
+            query,
+            SyncState(
+                history_id=history_id, message_ids=message_ids, synced_at=synced_at
+            ),
+        )
+        return message_ids
+
+    @classmethod
+    def __list_new_message_ids(
+        cls, sender_emails: str, keywords: str, previous_state: SyncState
+    ) -> List[str]:
+        """
+        History records cover the whole mailbox, so messages added since the previous sync
+        are matched against the query restricted to mail received after that sync.
+        """
+        added_ids = GmailGateway.list_added_message_ids(previous_state.history_id)
+        if not added_ids:
+            logger.info(f"No new messages since history_id={previous_state.history_id}")
+            return []
+
+        after = int(previous_state.synced_at) - INCREMENTAL_SYNC_MARGIN_SECONDS
+        new_ids = [
+            message_id
+            for message_id in GmailGateway.list_message_ids(
+                sender_emails, f"{keywords} after:{after}"
+            )
+            if message_id in added_ids
+        ]
+        logger.info(
+            f"Found {len(new_ids)} new emails since history_id={previous_state.history_id}"
+        )
+        return new_ids
+
+    @classmethod
+    def list_added_message_ids(cls, start_history_id: str) -> Set[str]:
+        """
+        Returns the IDs of every message added to the mailbox after 'start_history_id'.
+        Raises an HttpError with status 404 if the history ID is too old.
+        """
+        history_api = GmailClient.get_instance().users().history()
+        added_ids = set()
+        page_token = None
+        while True:
+            history_results = GmailGateway.execute(
+                "history.list",
+                history_api.list(
+                    userId="me",
+                    startHistoryId=start_history_id,
+                    historyTypes="messageAdded",
+                    pageToken=page_token,
+                ),
+            )
+
+            for record in history_results.get("history", []):
+                for added in record.get("messagesAdded", []):
+                    added_ids.add(added["message"]["id"])
+
+            page_token = history_results.get("nextPageToken")
+            if not page_token:
+                return added_ids
+
+    @classmethod
+    def get_current_history_id(cls) -> str:
+        return GmailGateway.execute(
+            "getProfile", GmailClient.get_instance().users().getProfile(userId="me")
+        )["historyId"]
 
     @classmethod
     def get_email_messages(
         cls,
         sender_emails: str,
         keywords: str,
-        max_results: int,
+        max_results: Optional[int] = None,
         fetch_body: bool = False,
+        batch_size: Optional[int] = MESSAGE_BATCH_SIZE,
+        page_token: Optional[str] = None,
+        profile: FetchProfile = DEFAULT_FETCH_PROFILE,
+        use_cache: bool = MESSAGE_CACHE_ENABLED,
+        incremental: bool = INCREMENTAL_SYNC_ENABLED,
     ) -> Iterable[GmailMessage]:
-        results = []
-        message_ids = GmailGateway.list_message_ids(
-            sender_emails, keywords, max_results
+        """
+        Fetches the messages matching the sender and keywords, requesting each message
+        with the format and fields of the given fetch profile. Details of each page of
+        message IDs are fetched while the next page is being listed. When 'batch_size' is
+        given, details are fetched through Gmail's batch endpoint with up to 'batch_size'
+        'messages.get' calls per HTTP request, instead of one request per message.
+        With 'use_cache', messages already in the local message cache are not fetched.
+        With 'incremental', message IDs are listed through the mailbox history since the
+        previous run instead of a full listing, ignoring 'max_results' and 'page_token'.
+        """
+        if fetch_body and not profile.includes_body:
+            raise ValueError(
+                f"Cannot fetch message body with {profile.format=}, use 'full' or 'raw'"
+            )
+
+        if incremental:
+            message_id_pages = [
+                MessageIdPage(
+                    message_ids=GmailGateway.list_message_ids_incremental(
+                        sender_emails, keywords
+                    )
+                )
+            ]
+        else:
+            message_id_pages = GmailGateway.iter_message_id_pages(
+                sender_emails, keywords, max_results, page_token
+            )
+        cached_messages = []
+        cache_key = GmailGateway.message_cache_key(profile, fetch_body)
+        if use_cache:
+            message_id_pages = GmailGateway.__skip_cached_messages(
+                message_id_pages, cache_key, cached_messages
+            )
+
+        if batch_size:
+            results = GmailGateway.__get_message_details_batched(
+                message_id_pages, fetch_body, batch_size, profile
+            )
+        else:
+            results = GmailGateway.__get_message_details_threaded(
+                message_id_pages, fetch_body, profile
+            )
+
+        if use_cache:
+            message_cache = MessageCache.get_instance()
+            message_cache.put_many(results, cache_key)
+            logger.info(f"Message cache usage {message_cache.get_stats()}")
+            results = cached_messages + results
+
+        logger.success(
+            f"Successfully fetched {len(results)} emails from Gmail API from {sender_emails=} and {keywords=}"
+        )
+        logger.info(f"Gmail transport usage {GmailClient.get_transport_stats()}")
+
+        return results
+
+    @classmethod
+    def iter_email_messages(
+        cls,
+        sender_emails: str,
+        keywords: str,
+        max_results: Optional[int] = None,
+        fetch_body: bool = False,
+        page_token: Optional[str] = None,
+        profile: FetchProfile = DEFAULT_FETCH_PROFILE,
+        use_cache: bool = MESSAGE_CACHE_ENABLED,
+        incremental: bool = INCREMENTAL_SYNC_ENABLED,
+        queue_size: int = STREAM_QUEUE_MAX_SIZE,
+        batch_size: Optional[int] = MESSAGE_BATCH_SIZE,
+    ) -> Iterator[GmailMessage]:
+        """
+        Streaming counterpart of 'get_email_messages', yielding each message as soon as it
+        is read from the cache or fetched, in completion order. Fetch workers hand messages
+        over through a queue of at most 'queue_size' messages, so they pause whenever the
+        consumer falls behind. When 'batch_size' is given, the missing messages of each
+        listed page are fetched through Gmail's batch endpoint instead of one request per
+        message.
+        """
+        if fetch_body and not profile.includes_body:
+            raise ValueError(
+                f"Cannot fetch message body with {profile.format=}, use 'full' or 'raw'"
+            )
+
+        if incremental:
+            message_id_pages = [
+                MessageIdPage(
+                    message_ids=GmailGateway.list_message_ids_incremental(
+                        sender_emails, keywords
+                    )
+                )
+            ]
+        else:
+            message_id_pages = GmailGateway.iter_message_id_pages(
+                sender_emails, keywords, max_results, page_token
+            )
+
+        cache_key = GmailGateway.message_cache_key(profile, fetch_body)
+        message_queue = queue.Queue(maxsize=queue_size)
+        stopped = threading.Event()
+
+        def put(item: Tuple[Optional[GmailMessage], bool]) -> bool:
+            while not stopped.is_set():
+                try:
+                    message_queue.put(item, timeout=STREAM_POLL_SECONDS)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def fetch_message(message_id: str):
+            if stopped.is_set():
+                return
+            put(
+                (GmailGateway.get_message_detail(message_id, fetch_body, profile), True)
+            )
+
+        def fetch_message_batch(message_ids: List[str]):
+            if stopped.is_set():
+                return
+            for message in GmailGateway.get_message_details_batch(
+                message_ids, fetch_body, batch_size, profile
+            ):
+                if not put((message, True)):
+                    return
+
+        # Raised to the consumer, as a failed listing must not look like the end of stream
+        listing_errors: List[Exception] = []
+
+        def produce():
+            try:
+                with ThreadPoolExecutor(max_workers=THREAD_POOL_MAX_WORKERS) as pool:
+                    future_mappings = {}
+                    for page in message_id_pages:
+                        missing_ids = page.message_ids
+                        if use_cache:
+                            cached = MessageCache.get_instance().get_many(
+                                page.message_ids, cache_key
+                            )
+                            for message in cached.values():
+                                if not put((message, False)):
+                                    return
+                            missing_ids = [
+                                message_id
+                                for message_id in page.message_ids
+                                if message_id not in cached
+                            ]
+                        if batch_size and missing_ids:
+                            future = pool.submit(fetch_message_batch, missing_ids)
+                            future_mappings[future] = missing_ids
+                            continue
+                        for message_id in missing_ids:
+                            future = pool.submit(fetch_message, message_id)
+                            future_mappings[future] = [message_id]
+
+                    for future in concurrent.futures.as_completed(future_mappings):
+                        if stopped.is_set():
+                            pool.shutdown(cancel_futures=True)
+                            return
+                        if future.exception():
+                            logger.error(
+                                f"Error fetching messages with message_ids={future_mappings[future]}: "
+                                f"{future.exception()}"
+                            )
+            except Exception as ex:
+                logger.error(f"Error listing messages for {sender_emails=}: {ex}")
+                listing_errors.append(ex)
+            finally:
+                put((None, False))
+
+        threading.Thread(target=produce, daemon=True).start()
+        fetched_messages, num_messages = [], 0
+        try:
+            while True:
+                message, fetched = message_queue.get()
+                if message is None:
+                    if listing_errors:
+                        raise listing_errors[0]
+                    break
+                num_messages += 1
+                if fetched and use_cache:
+                    fetched_messages.append(message)
+                    if len(fetched_messages) >= queue_size:
+                        MessageCache.get_instance().put_many(
+                            fetched_messages, cache_key
+                        )
+                        fetched_messages = []
+                yield message
+        finally:
+            stopped.set()
+            if fetched_messages:
+                MessageCache.get_instance().put_many(fetched_messages, cache_key)
+
+        logger.success(
+            f"Successfully streamed {num_messages} emails from Gmail API from {sender_emails=} and {keywords=}"
         )
 
+    @staticmethod
+    def message_cache_key(profile: FetchProfile, fetch_body: bool) -> str:
+        return f"{profile.cache_key}|{fetch_body=}"
+
+    @classmethod
+    def __skip_cached_messages(
+        cls,
+        message_id_pages: Iterable[MessageIdPage],
+        cache_key: str,
+        cached_messages: List[GmailMessage],
+    ) -> Iterator[MessageIdPage]:
+        """
+        Collects the cached messages of each page into 'cached_messages' and yields pages
+        with only the message IDs that still need fetching.
+        """
+        message_cache = MessageCache.get_instance()
+        for page in message_id_pages:
+            cached = message_cache.get_many(page.message_ids, cache_key)
+            cached_messages.extend(cached.values())
+            missing_ids = [
+                message_id
+                for message_id in page.message_ids
+                if message_id not in cached
+            ]
+            if missing_ids:
+                yield MessageIdPage(
+                    message_ids=missing_ids, next_page_token=page.next_page_token
+                )
+
+    @classmethod
+    def __get_message_details_batched(
+        cls,
+        message_id_pages: Iterable[MessageIdPage],
+        fetch_body: bool,
+        batch_size: int,
+        profile: FetchProfile,
+    ) -> List[GmailMessage]:
+        # A single worker keeps batches sequential while the next page is listed
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            futures = [
+                pool.submit(
+                    GmailGateway.get_message_details_batch,
+                    page.message_ids,
+                    fetch_body,
+                    batch_size,
+                    profile,
+                )
+                for page in message_id_pages
+            ]
+            return [message for future in futures for message in future.result()]
+
+    @classmethod
+    def __get_message_details_threaded(
+        cls,
+        message_id_pages: Iterable[MessageIdPage],
+        fetch_body: bool,
+        profile: FetchProfile,
+    ) -> List[GmailMessage]:
+        results = []
         with ThreadPoolExecutor(max_workers=THREAD_POOL_MAX_WORKERS) as pool:
-            num_messages = len(list(message_ids))
             logger.info(
-                f"⏳  Fetching {num_messages} email messages from Gmail API with thread pool..."
+                f"⏳  Fetching email messages from Gmail API with thread pool..."
             )
-            with alive_bar(num_messages) as bar:
-                futures = [
-                    pool.submit(GmailGateway.get_message_detail, message_id, fetch_body)
-                    for message_id in message_ids
-                ]
+            future_mappings = {
+                pool.submit(
+                    GmailGateway.get_message_detail, message_id, fetch_body, profile
+                ): message_id
+                for page in message_id_pages
+                for message_id in page.message_ids
+            }
 
-                for future in concurrent.futures.as_completed(futures):
+            failed_ids = []
+            with alive_bar(len(future_mappings)) as bar:
+                for future in concurrent.futures.as_completed(future_mappings):
                     try:
                         result = future.result()
                         results.append(result)
                         bar()
                     except Exception as ex:
-                        logger.error(f"Error fetching future result {ex}")
+                        failed_ids.append(future_mappings[future])
+                        logger.error(
+                            f"Error fetching message with message_id={future_mappings[future]}: {ex}"
+                        )
 
-        logger.success(
-            f"Successfully fetched {len(results)} emails from Gmail API from {sender_emails=} and {keywords=}"
+        if failed_ids:
+            logger.error(
+                f"{len(failed_ids)} messages could not be fetched after retries: {failed_ids}"
+            )
+        logger.info(
+            f"Gmail API scheduler usage {AdaptiveScheduler.get_instance().get_stats()}"
         )
+        return results
 
+    @classmethod
+    def get_message_details_batch(
+        cls,
+        message_ids: Iterable[str],
+        fetch_body: bool,
+        batch_size: int = BATCH_REQUEST_MAX_SIZE,
+        profile: FetchProfile = DEFAULT_FETCH_PROFILE,
+    ) -> List[GmailMessage]:
+        """
+        Fetches the detail of every message ID through Gmail's batch endpoint, mapping the
+        results to the same messages returned by 'get_message_detail'.
+        """
+        messages_api = GmailClient.get_instance().users().messages()
+        requests = {
+            message_id: messages_api.get(
+                id=message_id, userId="me", **profile.request_params()
+            )
+            for message_id in message_ids
+        }
+        logger.info(
+            f"⏳  Fetching {len(requests)} email messages from Gmail API in batches of {batch_size}..."
+        )
+        responses = GmailGateway.execute_batch(requests, batch_size)
+
+        results = []
+        for message_id, get_message_result in responses.items():
+            try:
+                results.append(
+                    GmailGateway.map_message(message_id, get_message_result, fetch_body)
+                )
+            except Exception as ex:
+                logger.error(f"Error mapping message with {message_id=}: {ex}")
         return results
 
     @classmethod
-    def get_message_detail(cls, message_id: str, fetch_body: bool) -> GmailMessage:
+    def get_message_detail(
+        cls,
+        message_id: str,
+        fetch_body: bool,
+        profile: FetchProfile = DEFAULT_FETCH_PROFILE,
+    ) -> GmailMessage:
         """
         Fetches the detail of a message with a given message ID.
         """
-        get_message_result = (
+        get_message_result = GmailGateway.execute(
+            "messages.get",
             GmailClient.get_instance()
             .users()
             .messages()
-            .get(id=message_id, userId="me")
-            .execute(http=GmailClient.auth_http_request())
+            .get(id=message_id, userId="me", **profile.request_params()),
         )
+        return GmailGateway.map_message(message_id, get_message_result, fetch_body)
 
-        attachment_list = GmailGateway.get_message_attachments(
-            get_message_result["payload"]
-        )
+    @classmethod
+    def map_message(
+        cls, message_id: str, get_message_result: Dict[str, Any], fetch_body: bool
+    ) -> GmailMessage:
+        """
+        Maps a 'messages.get' response in any format to a GmailMessage. Raw messages are
+        parsed from their RFC 2822 source and carry no attachment IDs.
+        """
+        if "raw" in get_message_result:
+            return GmailGateway.__map_raw_message(
+                message_id, get_message_result, fetch_body
+            )
+
+        payload = get_message_result.get("payload", {})
+        attachment_list = GmailGateway.get_message_attachments(payload)
         message_date = next(
-            item
-            for item in get_message_result["payload"]["headers"]
-            if item["name"] == "Date"
-        )["value"]
+            (
+                item["value"]
+                for item in payload.get("headers", [])
+                if item["name"] == "Date"
+            ),
+            None,
+        ) or GmailGateway.__get_internal_date(get_message_result)
 
         message_subject = get_message_result["snippet"]
         message = GmailMessage(
@@ -173,10 +724,150 @@ class GmailGateway:
         if not fetch_body:
             return message
 
-        message.body = GmailGateway.get_message_body(get_message_result["payload"])
+        message.body = GmailGateway.get_message_body(payload)
 
         return message
 
+    @classmethod
+    def __map_raw_message(
+        cls, message_id: str, get_message_result: Dict[str, Any], fetch_body: bool
+    ) -> GmailMessage:
+        mime_message = email.message_from_bytes(
+            base64.urlsafe_b64decode(get_message_result["raw"]),
+            policy=email.policy.default,
+        )
+        message = GmailMessage(
+            id=message_id,
+            subject=get_message_result.get("snippet", mime_message["Subject"]),
+            date=mime_message["Date"]
+            or GmailGateway.__get_internal_date(get_message_result),
+            attachments=[],
+        )
+        if fetch_body:
+            body_part = mime_message.get_body(preferencelist=("html", "plain"))
+            if body_part is not None:
+                message.body = body_part.get_content().replace("\n", "")
+        return message
+
+    @staticmethod
+    def __get_internal_date(get_message_result: Dict[str, Any]) -> Optional[str]:
+        """
+        Formats the epoch milliseconds 'internalDate' like a 'Date' header, for formats and
+        field masks that leave the headers out.
+        """
+        if "internalDate" not in get_message_result:
+            return None
+        return email.utils.format_datetime(
+            datetime.fromtimestamp(
+                int(get_message_result["internalDate"]) / 1000, tz=timezone.utc
+            )
+        )
+
+    @classmethod
+    def execute_batch(
+        cls,
+        requests: Dict[str, HttpRequest],
+        batch_size: int = BATCH_REQUEST_MAX_SIZE,
+        method: str = "messages.get",
+    ) -> Dict[str, Any]:
+        """
+        Executes the requests keyed by request ID through Gmail's batch endpoint, with up to
+        'batch_size' sub-requests per HTTP request. Sub-requests failing with a transient
+        error are retried in a new batch, and the ones that still fail after
+        'BATCH_REQUEST_MAX_RETRIES' retries are logged and left out of the responses.
+        Every sub-request is charged the quota units of 'method'.
+        """
+        if not 0 < batch_size <= BATCH_REQUEST_MAX_SIZE:
+            raise ValueError(
+                f"Batch size must be between 1 and {BATCH_REQUEST_MAX_SIZE}, got {batch_size=}"
+            )
+
+        scheduler = AdaptiveScheduler.get_instance()
+        responses = {}
+        pending = dict(requests)
+        for attempt in range(BATCH_REQUEST_MAX_RETRIES + 1):
+            if attempt > 0:
+                logger.warning(
+                    f"Retrying {len(pending)} failed batch sub-requests, {attempt=}"
+                )
+                time.sleep(scheduler.get_backoff_seconds(attempt - 1))
+
+            failed = {}
+            request_ids = list(pending.keys())
+            for start in range(0, len(request_ids), batch_size):
+                chunk = request_ids[start : start + batch_size]
+                failed.update(
+                    GmailGateway.__execute_batch_chunk(
+                        {request_id: pending[request_id] for request_id in chunk},
+                        responses,
+                        method,
+                    )
+                )
+
+            if any(is_rate_limit_error(ex) for ex in failed.values()):
+                scheduler.record_throttled()
+            pending = {
+                request_id: pending[request_id]
+                for request_id, ex in failed.items()
+                if is_transient_error(ex)
+            }
+            for request_id, ex in failed.items():
+                if request_id not in pending:
+                    logger.error(f"Batch sub-request failed with {request_id=}: {ex}")
+            if not pending:
+                break
+        else:
+            for request_id in pending:
+                logger.error(
+                    f"Batch sub-request with {request_id=} still failing after {BATCH_REQUEST_MAX_RETRIES} retries"
+                )
+
+        return responses
+
+    @classmethod
+    def __execute_batch_chunk(
+        cls, requests: Dict[str, HttpRequest], responses: Dict[str, Any], method: str
+    ) -> Dict[str, Exception]:
+        """
+        Executes a single batch HTTP request, storing successful sub-responses in
+        'responses' and returning the exceptions of the failed sub-requests.
+        """
+        failed = {}
+
+        def callback(request_id: str, response: Any, exception: Exception):
+            if exception is not None:
+                failed[request_id] = exception
+            else:
+                responses[request_id] = response
+
+        batch = GmailClient.get_instance().new_batch_http_request(callback=callback)
+        for request_id, request in requests.items():
+            batch.add(request, request_id=request_id)
+
+        try:
+            AdaptiveScheduler.get_instance().execute(
+                method,
+                lambda: batch.execute(http=GmailClient.auth_http_request()),
+                units=GMAIL_QUOTA_UNITS[method] * len(requests),
+            )
+        except Exception as ex:
+            logger.error(f"Error executing batch of {len(requests)} requests: {ex}")
+            return {
+                request_id: ex for request_id in requests if request_id not in responses
+            }
+
+        return failed
+
+    @staticmethod
+    def execute(method: str, request: HttpRequest) -> Dict[str, Any]:
+        """
+        Executes a single API request on the calling thread's transport, under the quota
+        budget, concurrency limit and retry policy of the adaptive scheduler.
+        """
+        return AdaptiveScheduler.get_instance().execute(
+            method, lambda: request.execute(http=GmailClient.auth_http_request())
+        )
+
     @classmethod
     def get_message_body(cls, message_payload: Dict[str, Any]) -> str:
         try:
@@ -228,11 +919,37 @@ class GmailGateway:
         Returns a base-64 string with the content for the .pdf attachment with 'message_id'
         and 'attachment_id'.
         """
-        return (
+        return GmailGateway.execute(
+            "messages.attachments.get",
             GmailClient.get_instance()
             .users()
             .messages()
             .attachments()
-            .get(userId="me", messageId=message_id, id=attachment_id)
-            .execute(http=GmailClient.auth_http_request())["data"]
+            .get(userId="me", messageId=message_id, id=attachment_id),
+        )["data"]
+
+    @classmethod
+    def get_message_attachments_batch(
+        cls,
+        attachment_ids: Iterable[Tuple[str, str]],
+        batch_size: int = BATCH_REQUEST_MAX_SIZE,
+    ) -> Dict[Tuple[str, str], str]:
+        """
+        Batched version of 'get_message_attachment', taking (message_id, attachment_id)
+        pairs and returning the base-64 content of each attachment keyed by the same pair.
+        """
+        attachments_api = GmailClient.get_instance().users().messages().attachments()
+        attachment_ids = list(attachment_ids)
+        requests = {
+            str(index): attachments_api.get(
+                userId="me", messageId=message_id, id=attachment_id
+            )
+            for index, (message_id, attachment_id) in enumerate(attachment_ids)
+        }
+        responses = GmailGateway.execute_batch(
+            requests, batch_size, method="messages.attachments.get"
         )
+        return {
+            attachment_ids[int(index)]: response["data"]
+            for index, response in responses.items()
+        }
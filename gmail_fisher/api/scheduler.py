@@ -0,0 +1,213 @@
+import random
+import socket
+import threading
+import time
+from dataclasses import dataclass, replace
+from typing import Callable, Final, Optional, Tuple, Type, TypeVar
+
+import httplib2
+from googleapiclient.errors import HttpError
+
+from gmail_fisher import get_logger
+from gmail_fisher.utils.config import (
+    ADAPTIVE_DECREASE_COOLDOWN_SECONDS,
+    ADAPTIVE_INITIAL_CONCURRENCY,
+    ADAPTIVE_LATENCY_TARGET_SECONDS,
+    ADAPTIVE_MIN_CONCURRENCY,
+    GMAIL_QUOTA_UNITS,
+    GMAIL_QUOTA_UNITS_PER_SECOND,
+    RETRY_BACKOFF_BASE_SECONDS,
+    RETRY_BACKOFF_MAX_SECONDS,
+    RETRY_MAX_ATTEMPTS,
+    RETRYABLE_HTTP_STATUS_CODES,
+    THREAD_POOL_MAX_WORKERS,
+)
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+# Errors raised when a request never got a response, as opposed to programming errors
+TRANSIENT_TRANSPORT_ERRORS: Final[Tuple[Type[Exception], ...]] = (
+    socket.timeout,
+    ConnectionError,
+    TimeoutError,
+    httplib2.HttpLib2Error,
+)
+
+
+def is_transient_error(exception: Exception) -> bool:
+    """
+    Whether a failed request is worth retrying, i.e. it was rate limited, hit a server
+    error or never got a response.
+    """
+    if isinstance(exception, HttpError):
+        status = exception.resp.status
+        if status == 403:
+            return is_rate_limit_error(exception)
+        return status in RETRYABLE_HTTP_STATUS_CODES
+    return isinstance(exception, TRANSIENT_TRANSPORT_ERRORS)
+
+
+def is_rate_limit_error(exception: Exception) -> bool:
+    if not isinstance(exception, HttpError):
+        return False
+    if exception.resp.status == 429:
+        return True
+    return exception.resp.status == 403 and b"ateLimitExceeded" in (
+        exception.content or b""
+    )
+
+
+@dataclass
+class SchedulerStats:
+    requests: int = 0
+    retries: int = 0
+    failures: int = 0
+    throttled: int = 0
+    quota_units: int = 0
+    concurrency_limit: float = 0
+
+
+class AdaptiveScheduler:
+    """
+    Runs Gmail API requests under a per-user quota budget, a token bucket that may go
+    into debt for batches costing more than it holds, and an adaptive concurrency limit.
+    The limit grows by one slot per window of fast successful requests and halves on rate
+    limiting or slow responses (AIMD). Transient failures are retried with
+    exponential backoff and full jitter.
+    """
+
+    __instance: Optional["AdaptiveScheduler"] = None
+    __instance_lock: Final[threading.Lock] = threading.Lock()
+
+    def __init__(
+        self,
+        initial_concurrency: int = ADAPTIVE_INITIAL_CONCURRENCY,
+        min_concurrency: int = ADAPTIVE_MIN_CONCURRENCY,
+        max_concurrency: int = THREAD_POOL_MAX_WORKERS,
+        quota_units_per_second: int = GMAIL_QUOTA_UNITS_PER_SECOND,
+        max_attempts: int = RETRY_MAX_ATTEMPTS,
+        latency_target_seconds: float = ADAPTIVE_LATENCY_TARGET_SECONDS,
+    ):
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.quota_units_per_second = quota_units_per_second
+        self.max_attempts = max_attempts
+        self.latency_target_seconds = latency_target_seconds
+        self.stats = SchedulerStats(concurrency_limit=initial_concurrency)
+        self.__condition = threading.Condition()
+        self.__in_flight = 0
+        self.__quota_tokens = float(quota_units_per_second)
+        self.__quota_refilled_at = time.monotonic()
+        self.__last_decrease_at = 0.0
+
+    @classmethod
+    def get_instance(cls) -> "AdaptiveScheduler":
+        with cls.__instance_lock:
+            if not cls.__instance:
+                cls.__instance = AdaptiveScheduler()
+            return cls.__instance
+
+    def execute(
+        self, method: str, request: Callable[[], T], units: Optional[int] = None
+    ) -> T:
+        """
+        Executes 'request', charging 'units' quota units (by default the cost of 'method')
+        and retrying it on transient errors. The last error is raised once all attempts
+        have failed.
+        """
+        units = units if units is not None else GMAIL_QUOTA_UNITS.get(method, 1)
+        for attempt in range(self.max_attempts):
+            self.__acquire(units)
+            started_at = time.monotonic()
+            try:
+                result = request()
+            except Exception as ex:
+                self.__release()
+                if not is_transient_error(ex) or attempt == self.max_attempts - 1:
+                    with self.__condition:
+                        self.stats.failures += 1
+                    raise
+                if is_rate_limit_error(ex):
+                    self.record_throttled()
+                delay = self.get_backoff_seconds(attempt)
+                logger.warning(
+                    f"Retrying {method} in {delay:.2f}s after transient error, {attempt=}: {ex}"
+                )
+                with self.__condition:
+                    self.stats.retries += 1
+                time.sleep(delay)
+                continue
+
+            self.__release(latency=time.monotonic() - started_at)
+            return result
+
+    def record_throttled(self):
+        """
+        Multiplicative decrease, applied at most once per cooldown window so a burst of
+        throttled in-flight requests does not collapse the limit.
+        """
+        with self.__condition:
+            self.stats.throttled += 1
+            self.__decrease()
+
+    @staticmethod
+    def get_backoff_seconds(attempt: int) -> float:
+        return random.uniform(
+            0, min(RETRY_BACKOFF_MAX_SECONDS, RETRY_BACKOFF_BASE_SECONDS * 2**attempt)
+        )
+
+    def get_stats(self) -> SchedulerStats:
+        with self.__condition:
+            return replace(self.stats)
+
+    def __acquire(self, units: int):
+        with self.__condition:
+            while self.__in_flight >= int(self.stats.concurrency_limit):
+                self.__condition.wait()
+            self.__in_flight += 1
+            self.stats.requests += 1
+            self.stats.quota_units += units
+
+            while True:
+                now = time.monotonic()
+                self.__quota_tokens = min(
+                    float(self.quota_units_per_second),
+                    self.__quota_tokens
+                    + (now - self.__quota_refilled_at) * self.quota_units_per_second,
+                )
+                self.__quota_refilled_at = now
+                # Requests are charged once the bucket is out of debt, so batches costing
+                # more than the bucket holds go through and later requests wait them off
+                if self.__quota_tokens >= 0:
+                    self.__quota_tokens -= units
+                    return
+                self.__condition.wait(
+                    -self.__quota_tokens / self.quota_units_per_second
+                )
+
+    def __release(self, latency: Optional[float] = None):
+        with self.__condition:
+            self.__in_flight -= 1
+            if latency is not None:
+                if latency > self.latency_target_seconds:
+                    self.__decrease()
+                else:
+                    self.stats.concurrency_limit = min(
+                        float(self.max_concurrency),
+                        self.stats.concurrency_limit + 1 / self.stats.concurrency_limit,
+                    )
+            self.__condition.notify_all()
+
+    def __decrease(self):
+        now = time.monotonic()
+        if now - self.__last_decrease_at < ADAPTIVE_DECREASE_COOLDOWN_SECONDS:
+            return
+        self.__last_decrease_at = now
+        self.stats.concurrency_limit = max(
+            float(self.min_concurrency), self.stats.concurrency_limit / 2
+        )
+        logger.info(
+            f"Reduced Gmail API concurrency limit to {int(self.stats.concurrency_limit)}"
+        )
@@ -0,0 +1,95 @@
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+from gmail_fisher import get_logger
+from gmail_fisher.data.sqlite_store import SQLiteStore
+from gmail_fisher.utils.config import CACHE_PATH
+
+logger = get_logger(__name__)
+
+
+class DedupIndex(SQLiteStore):
+    """
+    Persistent index of expense fingerprints, mapping each fingerprint to the ID of the
+    first expense seen with it. An expense is a duplicate when its fingerprint belongs to
+    an expense with another ID, whichever provider or earlier run that expense came from,
+    so re-exporting the same messages never drops them.
+    """
+
+    schema = (
+        """
+        CREATE TABLE IF NOT EXISTS fingerprints (
+            fingerprint TEXT PRIMARY KEY,
+            expense_id TEXT NOT NULL
+        )
+        """,
+    )
+
+    def __init__(self, db_path: Path = CACHE_PATH / "dedup_index.sqlite3"):
+        self.__owners: Dict[str, str] = {}
+        super().__init__(db_path)
+
+    def drop_duplicates(self, expenses: Iterable[Any]) -> Iterator[Any]:
+        """
+        Yields the expenses whose fingerprint is new or already owned by the same expense
+        ID, skipping repeated IDs. New fingerprints are claimed as soon as they are seen,
+        so concurrent runs over other providers see them, and are saved once the expenses
+        are consumed.
+        """
+        seen_ids = set()
+        new_owners = {}
+        num_duplicates = 0
+        try:
+            for expense in expenses:
+                fingerprint = expense.fingerprint
+                owner, claimed = self.claim(fingerprint, expense.id)
+                if expense.id in seen_ids or owner != expense.id:
+                    logger.warning(f"Detected duplicate {expense=}, will ignore...")
+                    num_duplicates += 1
+                    continue
+                seen_ids.add(expense.id)
+                if claimed:
+                    new_owners[fingerprint] = expense.id
+                yield expense
+        finally:
+            self.put_many(new_owners)
+            if num_duplicates:
+                logger.info(f"Dropped {num_duplicates} duplicate expenses")
+
+    def claim(self, fingerprint: str, expense_id: str) -> Tuple[str, bool]:
+        """
+        Makes 'expense_id' the owner of 'fingerprint' unless it already has one. Returns
+        the owner and whether it was claimed by this call.
+        """
+        with self.lock:
+            owner = self.__get_owner(fingerprint)
+            if owner is not None:
+                return owner, False
+            self.__owners[fingerprint] = expense_id
+            return expense_id, True
+
+    def get_owner(self, fingerprint: str) -> Optional[str]:
+        with self.lock:
+            return self.__get_owner(fingerprint)
+
+    def __get_owner(self, fingerprint: str) -> Optional[str]:
+        if fingerprint not in self.__owners:
+            row = self.connection.execute(
+                "SELECT expense_id FROM fingerprints WHERE fingerprint = ?",
+                (fingerprint,),
+            ).fetchone()
+            if row is None:
+                return None
+            self.__owners[fingerprint] = row[0]
+        return self.__owners[fingerprint]
+
+    def put_many(self, owners: Dict[str, str]):
+        if not owners:
+            return
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO fingerprints (fingerprint, expense_id) VALUES (?, ?)",
+                owners.items(),
+            )
+            for fingerprint, expense_id in owners.items():
+                self.__owners.setdefault(fingerprint, expense_id)
@@ -0,0 +1,121 @@
+import heapq
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Iterable, Iterator, List, Optional
+
+from gmail_fisher import get_logger
+from gmail_fisher.utils.config import EXTERNAL_SORT_MAX_IN_MEMORY
+
+logger = get_logger(__name__)
+
+
+def expense_date(expense: Any) -> str:
+    return expense.date or ""
+
+
+def sort_expenses_by_date(
+    expenses: Iterable[Any],
+    reverse: bool = True,
+    max_in_memory: int = EXTERNAL_SORT_MAX_IN_MEMORY,
+    spill_dir: Optional[Path] = None,
+) -> Iterator[Any]:
+    """
+    Yields expenses ordered by date, newest first by default, holding about
+    'max_in_memory' expenses at a time. Expenses are sorted in runs of that size, full
+    runs are spilled to temporary files, and the runs are merged lazily. Runs that are
+    already in order, as Gmail lists messages newest first, are not sorted, and runs that
+    follow each other in order are concatenated instead of merged. The sort is stable, as
+    'sorted' is.
+    """
+    runs: List[SortedRun] = []
+    try:
+        for items in _iter_sorted_runs(expenses, expense_date, reverse, max_in_memory):
+            runs.append(
+                SortedRun(
+                    items, expense_date, spill_dir, spill=len(items) == max_in_memory
+                )
+            )
+        if len(runs) > 1:
+            logger.info(
+                f"Merging {len(runs)} sorted runs of up to {max_in_memory} expenses"
+            )
+        yield from _merge_runs(runs, expense_date, reverse)
+    finally:
+        for run in runs:
+            run.close()
+
+
+class SortedRun:
+    """
+    Sorted run of items, kept in memory or spilled to an anonymous temporary file that is
+    removed once closed, along with the keys of its first and last items.
+    """
+
+    def __init__(
+        self,
+        items: List[Any],
+        key: Callable,
+        spill_dir: Optional[Path] = None,
+        spill: bool = False,
+    ):
+        self.first_key = key(items[0])
+        self.last_key = key(items[-1])
+        self.items: Optional[List[Any]] = items
+        self.file: Optional[BinaryIO] = None
+        if spill:
+            self.file = tempfile.TemporaryFile(dir=spill_dir)
+            pickler = pickle.Pickler(self.file, protocol=pickle.HIGHEST_PROTOCOL)
+            for item in items:
+                pickler.dump(item)
+            self.items = None
+
+    def __iter__(self) -> Iterator[Any]:
+        if self.items is not None:
+            yield from self.items
+            return
+        self.file.seek(0)
+        unpickler = pickle.Unpickler(self.file)
+        while True:
+            try:
+                yield unpickler.load()
+            except EOFError:
+                return
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+
+
+def _iter_sorted_runs(
+    items: Iterable[Any], key: Callable, reverse: bool, run_size: int
+) -> Iterator[List[Any]]:
+    run = []
+    for item in items:
+        run.append(item)
+        if len(run) == run_size:
+            yield _sort_run(run, key, reverse)
+            run = []
+    if run:
+        yield _sort_run(run, key, reverse)
+
+
+def _sort_run(run: List[Any], key: Callable, reverse: bool) -> List[Any]:
+    if _is_ordered([key(item) for item in run], reverse):
+        return run
+    return sorted(run, key=key, reverse=reverse)
+
+
+def _is_ordered(keys: List[Any], reverse: bool) -> bool:
+    return all(
+        (previous >= current) if reverse else (previous <= current)
+        for previous, current in zip(keys, keys[1:])
+    )
+
+
+def _merge_runs(runs: List[SortedRun], key: Callable, reverse: bool) -> Iterator[Any]:
+    if _is_ordered([k for run in runs for k in (run.first_key, run.last_key)], reverse):
+        for run in runs:
+            yield from run
+    else:
+        yield from heapq.merge(*runs, key=key, reverse=reverse)
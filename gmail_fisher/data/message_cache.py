@@ -0,0 +1,133 @@
+import json
+import time
+from dataclasses import dataclass, asdict, replace
+from pathlib import Path
+from typing import Iterable, Dict
+
+from gmail_fisher import get_logger
+from gmail_fisher.data.models import GmailMessage, MessageAttachment
+from gmail_fisher.data.sqlite_store import SQLiteStore, iter_query_chunks
+from gmail_fisher.utils.config import CACHE_PATH, MESSAGE_CACHE_MAX_BYTES
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+
+class MessageCache(SQLiteStore):
+    """
+    On-disk cache of Gmail messages keyed by message ID and fetch profile. Messages are
+    immutable once received, so entries never go stale; the least recently read ones are
+    evicted once the payloads exceed 'max_bytes'.
+    """
+
+    schema = (
+        """
+        CREATE TABLE IF NOT EXISTS messages (
+            message_id TEXT NOT NULL,
+            profile_key TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            last_accessed REAL NOT NULL,
+            PRIMARY KEY (message_id, profile_key)
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS messages_last_accessed ON messages (last_accessed)",
+    )
+
+    def __init__(
+        self,
+        db_path: Path = CACHE_PATH / "messages.sqlite3",
+        max_bytes: int = MESSAGE_CACHE_MAX_BYTES,
+    ):
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+        super().__init__(db_path)
+
+    def get_many(
+        self, message_ids: Iterable[str], profile_key: str
+    ) -> Dict[str, GmailMessage]:
+        """
+        Returns the cached messages for the given IDs, keyed by message ID. IDs that are not
+        cached for 'profile_key' are left out.
+        """
+        message_ids = list(message_ids)
+        messages = {}
+        with self.lock, self.connection:
+            for chunk in iter_query_chunks(message_ids):
+                placeholders = ",".join("?" * len(chunk))
+                rows = self.connection.execute(
+                    f"SELECT message_id, payload FROM messages "
+                    f"WHERE profile_key = ? AND message_id IN ({placeholders})",
+                    [profile_key, *chunk],
+                ).fetchall()
+                for message_id, payload in rows:
+                    messages[message_id] = self.__deserialize(payload)
+                self.connection.execute(
+                    f"UPDATE messages SET last_accessed = ? "
+                    f"WHERE profile_key = ? AND message_id IN ({placeholders})",
+                    [time.time(), profile_key, *chunk],
+                )
+            self.stats.hits += len(messages)
+            self.stats.misses += len(message_ids) - len(messages)
+        return messages
+
+    def put_many(self, messages: Iterable[GmailMessage], profile_key: str):
+        rows = []
+        now = time.time()
+        for message in messages:
+            payload = json.dumps(asdict(message), ensure_ascii=False)
+            rows.append((message.id, profile_key, payload, len(payload), now))
+
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO messages "
+                "(message_id, profile_key, payload, size, last_accessed) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            self.__evict()
+
+    def get_stats(self) -> CacheStats:
+        with self.lock:
+            return replace(self.stats)
+
+    def clear(self):
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM messages")
+
+    def __evict(self):
+        (total_bytes,) = self.connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM messages"
+        ).fetchone()
+        if total_bytes <= self.max_bytes:
+            return
+
+        excess_bytes = total_bytes - self.max_bytes
+        evicted_rowids = []
+        for rowid, size in self.connection.execute(
+            "SELECT rowid, size FROM messages ORDER BY last_accessed"
+        ):
+            if excess_bytes <= 0:
+                break
+            evicted_rowids.append((rowid,))
+            excess_bytes -= size
+
+        self.connection.executemany(
+            "DELETE FROM messages WHERE rowid = ?", evicted_rowids
+        )
+        self.stats.evictions += len(evicted_rowids)
+        logger.info(f"Evicted {len(evicted_rowids)} messages from cache {self.db_path}")
+
+    @staticmethod
+    def __deserialize(payload: str) -> GmailMessage:
+        message = GmailMessage(**json.loads(payload))
+        if message.attachments is not None:
+            message.attachments = [
+                MessageAttachment(**attachment) for attachment in message.attachments
+            ]
+        return message
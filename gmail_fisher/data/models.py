@@ -1,12 +1,67 @@
+import hashlib
 from dataclasses import dataclass
 from datetime import datetime
-from typing import List, Optional
+from functools import cached_property
+from typing import List, Optional, Tuple, Dict, Any
+
+import html2text
 
 from gmail_fisher import get_logger
+from gmail_fisher.data.text_nodes import TextNodes, extract_text_nodes
 
 logger = get_logger(__name__)
 
 
+def expense_fingerprint(kind: str, *values: Any) -> str:
+    """
+    Canonical hash of the values identifying an expense, ignoring case, surrounding
+    whitespace and float formatting so the same expense reported differently matches.
+    """
+    canonical = "|".join(
+        f"{value:.2f}"
+        if isinstance(value, (int, float)) and not isinstance(value, bool)
+        else str(value).strip().casefold()
+        for value in values
+    )
+    return hashlib.sha1(f"{kind}|{canonical}".encode()).hexdigest()
+
+
+class MessageFormat:
+    MINIMAL = "minimal"
+    METADATA = "metadata"
+    FULL = "full"
+    RAW = "raw"
+
+
+@dataclass(frozen=True)
+class FetchProfile:
+    """
+    Shape of the 'messages.get' response requested for each message. 'fields' is a
+    partial-response mask and must keep whatever the message mapping reads, i.e. 'id',
+    'snippet', and 'payload/headers', 'internalDate' or 'raw' depending on the format.
+    """
+
+    format: str = MessageFormat.FULL
+    metadata_headers: Tuple[str, ...] = ()
+    fields: Optional[str] = None
+
+    @property
+    def includes_body(self) -> bool:
+        return self.format in (MessageFormat.FULL, MessageFormat.RAW)
+
+    @property
+    def cache_key(self) -> str:
+        return f"{self.format}|{','.join(self.metadata_headers)}|{self.fields or ''}"
+
+    def request_params(self) -> Dict[str, Any]:
+        params = {"format": self.format}
+        if self.format == MessageFormat.METADATA and self.metadata_headers:
+            params["metadataHeaders"] = list(self.metadata_headers)
+        if self.fields:
+            params["fields"] = self.fields
+        return params
+
+
 @dataclass
 class MessageAttachment:
     part_id: str
@@ -22,6 +77,32 @@ class GmailMessage:
     attachments: Optional[List[MessageAttachment]] = None
     body: Optional[str] = None
 
+    @cached_property
+    def body_text(self) -> str:
+        """
+        Body converted from HTML to text, computed once and shared by every field extractor.
+        """
+        return html2text.html2text(self.body)
+
+    @cached_property
+    def body_lines(self) -> List[str]:
+        return self.body_text.split("\n")
+
+    @cached_property
+    def body_text_nodes(self) -> TextNodes:
+        """
+        Text nodes of the HTML body, read with the streaming tokenizer instead of html2text.
+        """
+        return TextNodes(extract_text_nodes(self.body))
+
+    def release_parsed_body(self):
+        """
+        Drops the converted body once the expense has been built from it.
+        """
+        self.__dict__.pop("body_text", None)
+        self.__dict__.pop("body_lines", None)
+        self.__dict__.pop("body_text_nodes", None)
+
     def get_date_as_datetime(self) -> datetime:
         """
         Fetches message date in the format e.g. 'Sun, 29 Nov 2020 21:32:07 +0000 (UTC)',
@@ -53,16 +134,41 @@ class FoodExpense:
     total_euros: float
     date: str
 
+    @property
+    def fingerprint(self) -> str:
+        # Receipts only carry the day, so two orders from the same restaurant at the same
+        # price on one day are told apart by their message alone
+        return expense_fingerprint("food", self.service, self.id)
+
 
 @dataclass
 class BankExpense:
-    def __init__(self, id: str, description: str, total_euros: str, date: str):
+    def __init__(
+        self,
+        id: str,
+        description: str,
+        total_euros: str,
+        date: str,
+        statement_line: Optional[str] = None,
+    ):
         self.id = id
         self.description = description
         self.total_euros = total_euros.replace("-", "")
         self.date = date
         self.transaction_type = self.get_transaction_type(total_euros)
         self.category = self.get_category(description)
+        # The ID is only the token before the amount and repeats across lines, so each
+        # line is told apart by the hash of its statement and its index within it
+        self.statement_line = statement_line
+
+    @classmethod
+    def from_dict(cls, expense: Dict[str, str]) -> "BankExpense":
+        """
+        Restores an expense from its '__dict__', e.g. as serialized to JSON.
+        """
+        bank_expense = cls.__new__(cls)
+        bank_expense.__dict__.update(expense)
+        return bank_expense
 
     @staticmethod
     def get_transaction_type(total_euros: str):
@@ -116,6 +222,12 @@ class TransportationExpense:
     # TODO Find a way to also scrap the time the transportation happened
     date: str
 
+    @property
+    def fingerprint(self) -> str:
+        # Rides only carry the day, so two identical rides on one day are told apart by
+        # their message alone
+        return expense_fingerprint("transport", self.service, self.id)
+
 
 @dataclass
 class BoltTransportationExpense(TransportationExpense):
@@ -156,11 +268,17 @@ class UberTransportationExpense(TransportationExpense):
         self.total_euros = total
         self.date = date
 
-    def same_expense(self, other_expense: "UberTransportationExpense") -> bool:
-        return (
-            self.distance_km == other_expense.distance_km
-            and self.from_address == other_expense.from_address
-            and self.to_address == other_expense.to_address
-            and self.total_euros == other_expense.total_euros
-            and self.date == other_expense.date
+    @property
+    def fingerprint(self) -> str:
+        # Uber sends the same receipt more than once, under different messages
+        return expense_fingerprint(
+            "uber",
+            self.distance_km,
+            self.from_address,
+            self.to_address,
+            self.total_euros,
+            self.date,
         )
+
+    def same_expense(self, other_expense: "UberTransportationExpense") -> bool:
+        return self.fingerprint == other_expense.fingerprint
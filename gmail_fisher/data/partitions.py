@@ -0,0 +1,71 @@
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple
+
+from gmail_fisher import get_logger
+from gmail_fisher.data.serializer import export_expenses
+from gmail_fisher.utils.config import PARTITION_FILENAME
+from gmail_fisher.utils.file_utils import FileUtils
+
+logger = get_logger(__name__)
+
+# Hive's name for the partition of rows with a missing partition value
+DEFAULT_PARTITION: str = "__HIVE_DEFAULT_PARTITION__"
+
+
+def get_partition(expense: Any, default_service: str) -> Tuple[str, str, str]:
+    """
+    (service, year, month) of an expense, with the service as a lowercase slug, e.g.
+    'uber-eats', and the year and month taken from its YYYY-MM-DD date.
+    """
+    service = getattr(expense, "service", None) or default_service
+    date = str(expense.date or "")
+    year, month = (date[:4], date[5:7]) if len(date) >= 7 else ("", "")
+    return (
+        "-".join(service.lower().split()),
+        year or DEFAULT_PARTITION,
+        month or DEFAULT_PARTITION,
+    )
+
+
+def get_partition_path(output_dir: Path, partition: Tuple[str, str, str]) -> Path:
+    service, year, month = partition
+    return (
+        output_dir
+        / f"service={service}"
+        / f"year={year}"
+        / f"month={month}"
+        / PARTITION_FILENAME
+    )
+
+
+def export_partitioned_expenses(
+    expenses: Iterable[Any],
+    output_dir: Path,
+    default_service: str,
+    merge: bool = False,
+) -> List[Path]:
+    """
+    Writes expenses under 'output_dir' in a 'service=.../year=YYYY/month=MM/part.jsonl'
+    layout, so readers can prune by service and month. With 'merge', new expenses are
+    merged into the existing partitions. Returns the partition files whose content
+    changed, which are the only ones that need uploading.
+    """
+    output_dir = Path(output_dir)
+    partitions: Dict[Tuple[str, str, str], List[Any]] = defaultdict(list)
+    for expense in expenses:
+        partitions[get_partition(expense, default_service)].append(expense)
+
+    changed_paths = []
+    for partition, partition_expenses in sorted(partitions.items()):
+        path = get_partition_path(output_dir, partition)
+        previous_md5 = FileUtils.md5(path) if path.exists() else None
+        changed = export_expenses(partition_expenses, path, merge)
+        if changed and FileUtils.md5(path) != previous_md5:
+            changed_paths.append(path)
+
+    logger.info(
+        f"Exported {len(partitions)} partitions to {output_dir=}, "
+        f"{len(changed_paths)} of which changed"
+    )
+    return changed_paths
@@ -1,42 +1,184 @@
+import concurrent
+import hashlib
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Any, Dict, Final, Iterable, List, Optional
 
 import boto3
-from botocore.exceptions import NoCredentialsError
+from boto3.exceptions import S3UploadFailedError
+from boto3.s3.transfer import TransferConfig
+from botocore.exceptions import BotoCoreError, ClientError
 from dotenv import load_dotenv
 
 from gmail_fisher import get_logger
+from gmail_fisher.utils.file_utils import FileUtils
+from gmail_fisher.utils.config import (
+    S3_MULTIPART_THRESHOLD_BYTES,
+    S3_MULTIPART_CHUNK_SIZE_BYTES,
+    S3_MULTIPART_MAX_CONCURRENCY,
+    S3_UPLOAD_MAX_WORKERS,
+)
 
 load_dotenv()
 logger = get_logger(__name__)
 
+# Object metadata key with the MD5 of the uploaded file
+MD5_METADATA_KEY: Final[str] = "md5"
+
+
+class UploadStatus:
+    UPLOADED = "uploaded"
+    SKIPPED = "skipped"
+    FAILED = "failed"
+
+
+@dataclass
+class UploadReport:
+    uploaded: List[str] = field(default_factory=list)
+    skipped: List[str] = field(default_factory=list)
+    failed: List[str] = field(default_factory=list)
+
+    @property
+    def succeeded(self) -> bool:
+        return not self.failed
+
 
 class S3BucketUploader:
-    def __init__(self):
-        access_key = os.environ.get("S3_ACCESS_KEY")
-        self.bucket_name = os.environ.get("S3_BUCKET_NAME")
-        self.s3_client = boto3.client(
-            "s3",
-            aws_access_key_id=access_key,
-            aws_secret_access_key=os.environ.get("S3_SECRET_KEY"),
+    """
+    Uploads files to the S3 bucket named by 'S3_BUCKET_NAME'. Every uploader shares one
+    S3 client, large files go up in concurrent multipart chunks, and objects whose content
+    already matches the local file are not uploaded again.
+    """
+
+    __client: Optional[Any] = None
+    __client_lock: Final[threading.Lock] = threading.Lock()
+
+    def __init__(self, client: Optional[Any] = None, bucket_name: Optional[str] = None):
+        self.bucket_name = bucket_name or os.environ.get("S3_BUCKET_NAME")
+        self.s3_client = client or S3BucketUploader.get_client()
+        self.transfer_config = TransferConfig(
+            multipart_threshold=S3_MULTIPART_THRESHOLD_BYTES,
+            multipart_chunksize=S3_MULTIPART_CHUNK_SIZE_BYTES,
+            max_concurrency=S3_MULTIPART_MAX_CONCURRENCY,
         )
         logger.info(f"Artifacts will be written to S3 bucket name '{self.bucket_name}'")
 
-    def upload(self, filepath: Path, key: str):
+    @classmethod
+    def get_client(cls):
+        with cls.__client_lock:
+            if cls.__client is None:
+                cls.__client = boto3.client(
+                    "s3",
+                    aws_access_key_id=os.environ.get("S3_ACCESS_KEY"),
+                    aws_secret_access_key=os.environ.get("S3_SECRET_KEY"),
+                )
+            return cls.__client
+
+    def upload(self, filepath: Path, key: str) -> str:
+        """
+        Uploads 'filepath' with 'key' unless the object already has the same content.
+        Returns the UploadStatus, logging the reason of failed uploads.
+        """
         try:
+            md5 = FileUtils.md5(filepath)
+            if self.__is_unchanged(filepath, key, md5):
+                logger.info(f"Skipping unchanged {filepath=} with {key=}")
+                return UploadStatus.SKIPPED
+
             logger.info(
                 f"Uploading {filepath=} to bucket='{self.bucket_name}' with {key=}..."
             )
-            self.s3_client.upload_file(str(filepath), self.bucket_name, key)
-        except FileNotFoundError as fnfe:
+            self.s3_client.upload_file(
+                str(filepath),
+                self.bucket_name,
+                key,
+                ExtraArgs={"Metadata": {MD5_METADATA_KEY: md5}},
+                Config=self.transfer_config,
+            )
+        except OSError as ose:
             logger.error(
-                f"File was not found for {filepath=}, exception='{fnfe.__class__.__name__}', message='{fnfe}'"
+                f"File could not be read for {filepath=}, exception='{ose.__class__.__name__}', message='{ose}'"
             )
-        except NoCredentialsError as nce:
+            return UploadStatus.FAILED
+        except (BotoCoreError, ClientError, S3UploadFailedError) as ex:
             logger.error(
-                f"Credentials not provided, exception='{nce.__class__.__name__}', message='{nce}'"
+                f"Failed to upload {filepath=} with {key=}, exception='{ex.__class__.__name__}', message='{ex}'"
             )
+            return UploadStatus.FAILED
 
         logger.success(
             f"Successfully uploaded {filepath=} to bucket='{self.bucket_name}' with {key=}"
         )
+        return UploadStatus.UPLOADED
+
+    def upload_many(self, files: Dict[Path, str]) -> UploadReport:
+        """
+        Uploads files keyed by their S3 key in parallel, and reports which keys were
+        uploaded, skipped as unchanged, or failed.
+        """
+        report = UploadReport()
+        if not files:
+            return report
+        with ThreadPoolExecutor(
+            max_workers=min(S3_UPLOAD_MAX_WORKERS, len(files))
+        ) as pool:
+            future_mappings = {
+                pool.submit(self.upload, filepath, key): key
+                for filepath, key in files.items()
+            }
+            for future in concurrent.futures.as_completed(future_mappings):
+                key = future_mappings[future]
+                getattr(report, future.result()).append(key)
+
+        log = logger.success if report.succeeded else logger.error
+        log(
+            f"Uploaded {len(report.uploaded)} files to bucket='{self.bucket_name}', "
+            f"skipped {len(report.skipped)} unchanged, {len(report.failed)} failed"
+        )
+        return report
+
+    def upload_partitions(
+        self, output_dir: Path, partition_paths: Iterable[Path]
+    ) -> UploadReport:
+        """
+        Uploads partition files under 'output_dir', keyed by their path relative to the
+        parent of 'output_dir', e.g. 'food/service=uber-eats/year=2021/month=06/part.jsonl'.
+        """
+        return self.upload_many(
+            {
+                path: path.relative_to(output_dir.parent).as_posix()
+                for path in partition_paths
+            }
+        )
+
+    def __is_unchanged(self, filepath: Path, key: str, md5: str) -> bool:
+        try:
+            head = self.s3_client.head_object(Bucket=self.bucket_name, Key=key)
+        except ClientError as ex:
+            # Missing objects are 404, or 403 without permission to list the bucket
+            logger.debug(f"Could not get object with {key=}, error={ex}")
+            return False
+
+        if head.get("Metadata", {}).get(MD5_METADATA_KEY) == md5:
+            return True
+        return head.get("ETag", "").strip('"') == file_etag(
+            filepath, S3_MULTIPART_THRESHOLD_BYTES, S3_MULTIPART_CHUNK_SIZE_BYTES
+        )
+
+
+def file_etag(path: Path, multipart_threshold: int, chunk_size: int) -> str:
+    """
+    ETag S3 gives a file uploaded with the given multipart settings: the MD5 of the file
+    for single-part uploads, else the MD5 of the concatenated part MD5s followed by the
+    number of parts.
+    """
+    if os.path.getsize(path) < multipart_threshold:
+        return FileUtils.md5(path)
+    part_digests = []
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            part_digests.append(hashlib.md5(chunk).digest())
+    return f"{hashlib.md5(b''.join(part_digests)).hexdigest()}-{len(part_digests)}"
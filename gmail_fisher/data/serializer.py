@@ -0,0 +1,374 @@
+import csv
+import gzip
+import heapq
+import io
+import json
+import os
+import textwrap
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional, Set, TextIO, Tuple
+
+from gmail_fisher import get_logger
+from gmail_fisher.data.external_sort import sort_expenses_by_date
+from gmail_fisher.utils.config import PARQUET_BATCH_SIZE
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+logger = get_logger(__name__)
+
+
+class OutputFormat:
+    JSON = "json"
+    JSONL = "jsonl"
+    CSV = "csv"
+    PARQUET = "parquet"
+
+
+class Compression:
+    GZIP = "gzip"
+    ZSTD = "zstd"
+
+
+FORMAT_SUFFIXES: Dict[str, str] = {
+    ".json": OutputFormat.JSON,
+    ".jsonl": OutputFormat.JSONL,
+    ".csv": OutputFormat.CSV,
+    ".parquet": OutputFormat.PARQUET,
+}
+COMPRESSION_SUFFIXES: Dict[str, str] = {
+    ".gz": Compression.GZIP,
+    ".zst": Compression.ZSTD,
+}
+
+
+def infer_output_format(output_path: Path) -> Tuple[str, Optional[str]]:
+    """
+    Output format and compression from the file suffixes, e.g. 'expenses.jsonl.gz' is
+    gzip compressed JSON Lines. Unknown suffixes default to an uncompressed JSON array.
+    """
+    suffixes = [suffix.lower() for suffix in output_path.suffixes]
+    compression = COMPRESSION_SUFFIXES.get(suffixes[-1]) if suffixes else None
+    if compression:
+        suffixes = suffixes[:-1]
+    output_format = FORMAT_SUFFIXES.get(suffixes[-1], None) if suffixes else None
+    return output_format or OutputFormat.JSON, compression
+
+
+def serialize_expenses(
+    expenses: Iterable[Any],
+    output_path: Path,
+    output_format: Optional[str] = None,
+    compression: Optional[str] = None,
+) -> int:
+    """
+    Streams expenses, newest first, to 'output_path' as a JSON array, JSON Lines, CSV or
+    Parquet, optionally gzip or zstd compressed. Format and compression are inferred from
+    the file suffixes unless given. The file is written under a temporary name and
+    renamed once complete, so readers never see a partial export, and the sidecar index
+    of exported IDs used by 'merge_expenses_into_file' is rewritten to match. Returns
+    the number of expenses written.
+    """
+    output_path = Path(output_path)
+    output_format, compression = resolve_output_format(
+        output_path, output_format, compression
+    )
+    logger.info(
+        f"Exporting expenses to {output_path=} with {output_format=}, {compression=}"
+    )
+
+    # The old index is removed first, so a failed export never leaves it out of date
+    id_index_path(output_path).unlink(missing_ok=True)
+    exported_ids = set()
+
+    def iter_rows() -> Iterator[Dict[str, Any]]:
+        for expense in sort_expenses_by_date(expenses):
+            exported_ids.add(row_key(expense.__dict__))
+            yield expense.__dict__
+
+    num_rows = write_rows(iter_rows(), output_path, output_format, compression)
+    write_id_index(output_path, exported_ids)
+
+    logger.success(f"Successfully written {num_rows} expenses to {output_path=}")
+    return num_rows
+
+
+def merge_expenses_into_file(
+    expenses: Iterable[Any],
+    output_path: Path,
+    output_format: Optional[str] = None,
+    compression: Optional[str] = None,
+) -> int:
+    """
+    Inserts, in date order, the expenses whose row key is not yet in the export at
+    'output_path', creating it if needed. Exported keys are kept in a sidecar index next
+    to the export, and read from the export itself when the index is missing. The export
+    is left untouched when there is nothing new. Returns the number of expenses added.
+    """
+    output_path = Path(output_path)
+    output_format, compression = resolve_output_format(
+        output_path, output_format, compression
+    )
+    if output_path.exists():
+        exported_ids = read_id_index(output_path)
+        if exported_ids is None:
+            exported_ids = {
+                row_key(row)
+                for row in read_rows(output_path, output_format, compression)
+            }
+    else:
+        exported_ids = set()
+
+    new_expenses = []
+    for expense in expenses:
+        key = row_key(expense.__dict__)
+        if key not in exported_ids:
+            exported_ids.add(key)
+            new_expenses.append(expense)
+    if not new_expenses:
+        logger.info(f"No new expenses to merge into {output_path=}")
+        return 0
+
+    new_rows = (expense.__dict__ for expense in sort_expenses_by_date(new_expenses))
+    if output_path.exists():
+        rows = heapq.merge(
+            read_rows(output_path, output_format, compression),
+            new_rows,
+            key=lambda row: row["date"] or "",
+            reverse=True,
+        )
+    else:
+        rows = new_rows
+    write_rows(rows, output_path, output_format, compression)
+    write_id_index(output_path, exported_ids)
+
+    logger.success(
+        f"Successfully merged {len(new_expenses)} expenses into {output_path=}"
+    )
+    return len(new_expenses)
+
+
+def export_expenses(
+    expenses: Iterable[Any], output_path: Path, merge: bool = False
+) -> bool:
+    """
+    Writes expenses to 'output_path' or, with 'merge', merges them into the existing
+    export. Returns whether the export changed.
+    """
+    if merge:
+        return merge_expenses_into_file(expenses, output_path) > 0
+    serialize_expenses(expenses, output_path)
+    return True
+
+
+def resolve_output_format(
+    output_path: Path, output_format: Optional[str], compression: Optional[str]
+) -> Tuple[str, Optional[str]]:
+    inferred_format, inferred_compression = infer_output_format(output_path)
+    return output_format or inferred_format, compression or inferred_compression
+
+
+def write_rows(
+    rows: Iterable[Dict[str, Any]],
+    output_path: Path,
+    output_format: str,
+    compression: Optional[str] = None,
+) -> int:
+    with atomic_output_path(output_path) as temp_path:
+        if output_format == OutputFormat.PARQUET:
+            return write_parquet(rows, temp_path, compression)
+        writer = TEXT_WRITERS.get(output_format)
+        if writer is None:
+            raise RuntimeError(f"Invalid output format {output_format=}")
+        with open_text(temp_path, compression) as output:
+            return writer(rows, output)
+
+
+def read_rows(
+    path: Path, output_format: str, compression: Optional[str] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Reads back the rows of an export written by 'write_rows'.
+    """
+    if output_format == OutputFormat.PARQUET:
+        if pyarrow is None:
+            raise RuntimeError("Parquet output requires the 'pyarrow' package")
+        for batch in pyarrow.parquet.ParquetFile(path).iter_batches():
+            yield from batch.to_pylist()
+        return
+    with open_text_reader(path, compression) as text:
+        if output_format == OutputFormat.JSON:
+            yield from json.load(text)
+        elif output_format == OutputFormat.JSONL:
+            yield from (json.loads(line) for line in text if line.strip())
+        elif output_format == OutputFormat.CSV:
+            yield from csv.DictReader(text)
+        else:
+            raise RuntimeError(f"Invalid output format {output_format=}")
+
+
+def row_key(row: Dict[str, Any]) -> str:
+    """
+    Key of an exported row: the statement line of bank expenses, whose IDs repeat, or
+    else the expense ID.
+    """
+    return row.get("statement_line") or row["id"]
+
+
+def id_index_path(output_path: Path) -> Path:
+    return output_path.with_name(f"{output_path.name}.ids")
+
+
+def read_id_index(output_path: Path) -> Optional[Set[str]]:
+    index_path = id_index_path(output_path)
+    if not index_path.exists():
+        return None
+    return set(index_path.read_text().split())
+
+
+def write_id_index(output_path: Path, ids: Iterable[str]):
+    with atomic_output_path(id_index_path(output_path)) as temp_path:
+        temp_path.write_text("".join(f"{id}\n" for id in sorted(ids)))
+
+
+@contextmanager
+def atomic_output_path(output_path: Path) -> Iterator[Path]:
+    """
+    Yields a temporary path next to 'output_path', which replaces 'output_path' once the
+    block completes and is removed if it fails.
+    """
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = output_path.with_name(f".{output_path.name}.{os.getpid()}.tmp")
+    try:
+        yield temp_path
+        os.replace(temp_path, output_path)
+    finally:
+        temp_path.unlink(missing_ok=True)
+
+
+@contextmanager
+def open_text_reader(path: Path, compression: Optional[str] = None) -> Iterator[TextIO]:
+    with open(path, "rb") as raw:
+        if compression == Compression.GZIP:
+            stream = gzip.GzipFile(fileobj=raw, mode="rb")
+        elif compression == Compression.ZSTD:
+            if zstandard is None:
+                raise RuntimeError("zstd compression requires the 'zstandard' package")
+            stream = zstandard.ZstdDecompressor().stream_reader(raw, closefd=False)
+        elif compression is None:
+            stream = raw
+        else:
+            raise RuntimeError(f"Invalid compression {compression=}")
+        with io.TextIOWrapper(stream, encoding="utf-8", newline="") as text:
+            yield text
+
+
+@contextmanager
+def open_text(path: Path, compression: Optional[str] = None) -> Iterator[TextIO]:
+    with open(path, "wb") as raw:
+        if compression == Compression.GZIP:
+            stream = gzip.GzipFile(fileobj=raw, mode="wb")
+        elif compression == Compression.ZSTD:
+            if zstandard is None:
+                raise RuntimeError("zstd compression requires the 'zstandard' package")
+            stream = zstandard.ZstdCompressor().stream_writer(raw, closefd=False)
+        elif compression is None:
+            stream = raw
+        else:
+            raise RuntimeError(f"Invalid compression {compression=}")
+        with io.TextIOWrapper(stream, encoding="utf-8", newline="") as text:
+            yield text
+
+
+def write_json(rows: Iterable[Dict[str, Any]], output: TextIO) -> int:
+    """
+    Writes the same pretty-printed JSON array as 'json.dumps(rows, indent=4)', one row at
+    a time.
+    """
+    num_rows = 0
+    for row in rows:
+        output.write("[\n" if num_rows == 0 else ",\n")
+        output.write(
+            textwrap.indent(json.dumps(row, ensure_ascii=False, indent=4), " " * 4)
+        )
+        num_rows += 1
+    output.write("\n]" if num_rows else "[]")
+    return num_rows
+
+
+def write_jsonl(rows: Iterable[Dict[str, Any]], output: TextIO) -> int:
+    num_rows = 0
+    for row in rows:
+        output.write(json.dumps(row, ensure_ascii=False) + "\n")
+        num_rows += 1
+    return num_rows
+
+
+def write_csv(rows: Iterable[Dict[str, Any]], output: TextIO) -> int:
+    num_rows = 0
+    writer = None
+    for row in rows:
+        if writer is None:
+            writer = csv.DictWriter(output, fieldnames=list(row), extrasaction="ignore")
+            writer.writeheader()
+        writer.writerow(row)
+        num_rows += 1
+    return num_rows
+
+
+def write_parquet(
+    rows: Iterable[Dict[str, Any]], path: Path, compression: Optional[str] = None
+) -> int:
+    """
+    Writes rows in record batches of PARQUET_BATCH_SIZE, with 'compression' as the
+    Parquet column codec. The schema is inferred from the first batch.
+    """
+    if pyarrow is None:
+        raise RuntimeError("Parquet output requires the 'pyarrow' package")
+
+    num_rows = 0
+    writer = None
+    try:
+        for batch in batched(rows, PARQUET_BATCH_SIZE):
+            table = pyarrow.Table.from_pylist(
+                batch, schema=writer.schema if writer else None
+            )
+            if writer is None:
+                writer = pyarrow.parquet.ParquetWriter(
+                    path, table.schema, compression=compression or "snappy"
+                )
+            writer.write_table(table)
+            num_rows += len(batch)
+        if writer is None:
+            pyarrow.parquet.write_table(pyarrow.table({}), path)
+    finally:
+        if writer is not None:
+            writer.close()
+    return num_rows
+
+
+def batched(items: Iterable[Any], size: int) -> Iterator[list]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+TEXT_WRITERS: Dict[str, Any] = {
+    OutputFormat.JSON: write_json,
+    OutputFormat.JSONL: write_jsonl,
+    OutputFormat.CSV: write_csv,
+}
@@ -0,0 +1,47 @@
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Final, Iterator, List, Tuple, Type, TypeVar
+
+# SQLite caps the number of bound parameters per statement
+QUERY_CHUNK_SIZE: Final[int] = 500
+
+Store = TypeVar("Store", bound="SQLiteStore")
+
+
+class SQLiteStore:
+    """
+    Base of the on-disk stores under CACHE_PATH. Each store keeps one SQLite connection,
+    shared by every thread and guarded by 'lock', creates the tables and indexes in
+    'schema' when the database is opened, and has one instance per process, created on
+    first use with its default arguments.
+    """
+
+    schema: Tuple[str, ...] = ()
+
+    __instances: Dict[type, "SQLiteStore"] = {}
+    __instance_lock: Final[threading.Lock] = threading.Lock()
+
+    def __init__(self, db_path: Path):
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.db_path = db_path
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(db_path, check_same_thread=False)
+        with self.connection:
+            for statement in self.schema:
+                self.connection.execute(statement)
+
+    @classmethod
+    def get_instance(cls: Type[Store]) -> Store:
+        with SQLiteStore.__instance_lock:
+            if cls not in SQLiteStore.__instances:
+                SQLiteStore.__instances[cls] = cls()
+            return SQLiteStore.__instances[cls]
+
+
+def iter_query_chunks(values: List[str]) -> Iterator[List[str]]:
+    """
+    Splits the values bound to an 'IN (...)' query into chunks of QUERY_CHUNK_SIZE.
+    """
+    for start in range(0, len(values), QUERY_CHUNK_SIZE):
+        yield values[start : start + QUERY_CHUNK_SIZE]
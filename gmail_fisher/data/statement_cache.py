@@ -0,0 +1,89 @@
+import hashlib
+import json
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from gmail_fisher import get_logger
+from gmail_fisher.data.models import BankExpense
+from gmail_fisher.data.sqlite_store import SQLiteStore, iter_query_chunks
+from gmail_fisher.utils.config import CACHE_PATH
+
+logger = get_logger(__name__)
+
+
+class StatementCache(SQLiteStore):
+    """
+    On-disk cache of the expenses parsed from each bank statement, keyed by the SHA-256 of
+    the statement PDF. Entries also keep the message and attachment IDs they were
+    downloaded from. Statements never change once sent, so a message whose statement was
+    already parsed does not need its attachment downloaded again.
+    """
+
+    schema = (
+        """
+        CREATE TABLE IF NOT EXISTS statements (
+            content_hash TEXT PRIMARY KEY,
+            message_id TEXT NOT NULL,
+            attachment_id TEXT NOT NULL,
+            expenses TEXT NOT NULL,
+            parsed_at REAL NOT NULL
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS statements_message_id ON statements (message_id)",
+    )
+
+    def __init__(self, db_path: Path = CACHE_PATH / "statements.sqlite3"):
+        super().__init__(db_path)
+
+    @staticmethod
+    def content_hash(content: bytes) -> str:
+        return hashlib.sha256(content).hexdigest()
+
+    def get_by_message_ids(
+        self, message_ids: Iterable[str]
+    ) -> Dict[str, List[BankExpense]]:
+        """
+        Returns the cached expenses of the statements attached to the given messages, keyed
+        by message ID. Messages without a cached statement are left out.
+        """
+        message_ids = list(message_ids)
+        rows = []
+        with self.lock:
+            for chunk in iter_query_chunks(message_ids):
+                rows += self.connection.execute(
+                    f"SELECT message_id, expenses FROM statements WHERE message_id IN "
+                    f"({','.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+        return {
+            message_id: self.__load_expenses(expenses) for message_id, expenses in rows
+        }
+
+    def get(self, content_hash: str) -> Optional[List[BankExpense]]:
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT expenses FROM statements WHERE content_hash = ?",
+                (content_hash,),
+            ).fetchone()
+        return None if row is None else self.__load_expenses(row[0])
+
+    def put(
+        self,
+        content_hash: str,
+        message_id: str,
+        attachment_id: str,
+        expenses: Iterable[BankExpense],
+    ):
+        payload = json.dumps([expense.__dict__ for expense in expenses])
+        with self.lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO statements "
+                "(content_hash, message_id, attachment_id, expenses, parsed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (content_hash, message_id, attachment_id, payload, time.time()),
+            )
+
+    @staticmethod
+    def __load_expenses(payload: str) -> List[BankExpense]:
+        return [BankExpense.from_dict(expense) for expense in json.loads(payload)]
@@ -0,0 +1,70 @@
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+
+from gmail_fisher import get_logger
+from gmail_fisher.data.sqlite_store import SQLiteStore
+from gmail_fisher.utils.config import CACHE_PATH
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class SyncState:
+    history_id: str
+    message_ids: List[str]
+    synced_at: float
+
+
+class SyncStateStore(SQLiteStore):
+    """
+    Persists, for each Gmail search query, the mailbox history ID at the last sync and the
+    message IDs that matched the query at that point.
+    """
+
+    schema = (
+        """
+        CREATE TABLE IF NOT EXISTS sync_state (
+            query TEXT PRIMARY KEY,
+            history_id TEXT NOT NULL,
+            message_ids TEXT NOT NULL,
+            synced_at REAL NOT NULL
+        )
+        """,
+    )
+
+    def __init__(self, db_path: Path = CACHE_PATH / "sync_state.sqlite3"):
+        super().__init__(db_path)
+
+    def get(self, query: str) -> Optional[SyncState]:
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT history_id, message_ids, synced_at FROM sync_state WHERE query = ?",
+                (query,),
+            ).fetchone()
+        if row is None:
+            return None
+        history_id, message_ids, synced_at = row
+        return SyncState(
+            history_id=history_id,
+            message_ids=json.loads(message_ids),
+            synced_at=synced_at,
+        )
+
+    def put(self, query: str, state: SyncState):
+        with self.lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO sync_state (query, history_id, message_ids, synced_at) "
+                "VALUES (?, ?, ?, ?)",
+                (
+                    query,
+                    state.history_id,
+                    json.dumps(state.message_ids),
+                    state.synced_at,
+                ),
+            )
+        logger.info(
+            f"Saved sync state with {query=}, history_id={state.history_id}, "
+            f"{len(state.message_ids)} message IDs"
+        )
@@ -0,0 +1,68 @@
+import re
+from html.parser import HTMLParser
+from typing import List, Optional, Final, Pattern
+
+SKIPPED_TAGS: Final[frozenset] = frozenset({"head", "style", "script", "title"})
+
+
+class TextNodeParser(HTMLParser):
+    """
+    Streaming tokenizer collecting the non-blank text nodes of an HTML document, without
+    rendering it. Text inside head, style and script elements is skipped.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.text_nodes: List[str] = []
+        self.__skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIPPED_TAGS:
+            self.__skip_depth += 1
+
+    def handle_endtag(self, tag):
+        if tag in SKIPPED_TAGS and self.__skip_depth:
+            self.__skip_depth -= 1
+
+    def handle_data(self, data):
+        if self.__skip_depth:
+            return
+        text = " ".join(data.split())
+        if text:
+            self.text_nodes.append(text)
+
+
+def extract_text_nodes(html: str) -> List[str]:
+    parser = TextNodeParser()
+    parser.feed(html)
+    parser.close()
+    return parser.text_nodes
+
+
+class TextNodes:
+    """
+    Anchor-based lookups over the text nodes of a receipt.
+    """
+
+    def __init__(self, nodes: List[str]):
+        self.nodes = nodes
+
+    def after(self, anchor: str, offset: int = 1) -> Optional[str]:
+        """
+        Returns the text node 'offset' positions after the first node containing 'anchor'.
+        """
+        for index, node in enumerate(self.nodes):
+            if anchor in node:
+                target = index + offset
+                return self.nodes[target] if target < len(self.nodes) else None
+        return None
+
+    def first(self, pattern: Pattern) -> Optional[re.Match]:
+        """
+        Returns the match of 'pattern' in the first text node where it is found.
+        """
+        for node in self.nodes:
+            match = pattern.search(node)
+            if match:
+                return match
+        return None
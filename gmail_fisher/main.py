@@ -1,6 +1,11 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Query
 
+from gmail_fisher.api.async_gateway import AsyncGmailGateway
 from gmail_fisher.services.food import get_food_expenses
+from gmail_fisher.utils.config import (
+    MESSAGES_ENDPOINT_DEFAULT_RESULTS,
+    MESSAGES_ENDPOINT_MAX_RESULTS,
+)
 
 
 app = FastAPI()
@@ -9,3 +14,16 @@ app = FastAPI()
 @app.get("/expenses/food")
 def read_food_expenses():
     return get_food_expenses()
+
+
+@app.get("/messages")
+async def read_messages(
+    sender_email: str,
+    keywords: str,
+    max_results: int = Query(
+        MESSAGES_ENDPOINT_DEFAULT_RESULTS, ge=1, le=MESSAGES_ENDPOINT_MAX_RESULTS
+    ),
+):
+    return await AsyncGmailGateway.get_email_messages(
+        sender_email, keywords, max_results=max_results
+    )
@@ -1,5 +1,11 @@
+from typing import Iterable, Optional, Sized
+
+from alive_progress import alive_bar
+
 from gmail_fisher.utils.file_utils import logger
 
+progress_bars_enabled = True
+
 
 def print_header(title):
     box_size = 40
@@ -10,3 +16,22 @@ def print_header(title):
         f"{box_char * 2} {title.upper()}{' ' * (box_size - len(title) - 5)}{box_char * 2}"
     )
     logger.info(box_char * 40)
+
+
+def count_if_sized(items: Iterable) -> Optional[int]:
+    """
+    Total for progress bars, without consuming 'items' when it is a generator.
+    """
+    return len(items) if isinstance(items, Sized) else None
+
+
+def progress_bar(items: Iterable):
+    """
+    Progress bar over 'items', disabled in parse worker processes.
+    """
+    return alive_bar(count_if_sized(items), disable=not progress_bars_enabled)
+
+
+def disable_progress_bars():
+    global progress_bars_enabled
+    progress_bars_enabled = False
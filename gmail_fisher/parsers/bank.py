@@ -1,16 +1,28 @@
-import json
+import concurrent
+import multiprocessing
 import re
-import shutil
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from abc import ABC, abstractmethod
+from io import BytesIO
 from pathlib import Path
-from typing import Iterable, Final
+from typing import Iterable, Iterator, Final, List, Union, Optional
 
 import pdfplumber
 
 from gmail_fisher import get_logger
-from gmail_fisher.utils.config import TEMP_PATH
+from gmail_fisher.utils.config import (
+    TEMP_PATH,
+    THREAD_POOL_MAX_WORKERS,
+    PARSE_PROCESS_MAX_WORKERS,
+    SAVE_STATEMENT_TEMP_FILES,
+    BANK_STATEMENT_CROP_BOX,
+    BoundingBox,
+    STATEMENT_CACHE_ENABLED,
+)
 from gmail_fisher.api.gateway import GmailGateway
-from gmail_fisher.data.models import BankExpense
+from gmail_fisher.data.models import BankExpense, GmailMessage
+from gmail_fisher.data.statement_cache import StatementCache
+from gmail_fisher.parsers.patterns import BANCO_CTT_TRANSACTION_LINE
 from gmail_fisher.utils.file_utils import FileUtils
 
 logger = get_logger(__name__)
@@ -22,29 +34,11 @@ class BankStatementParser(ABC):
     def fetch_expenses(cls) -> Iterable[BankExpense]:
         pass
 
-    @classmethod
-    def serialize_expenses_to_json_file(
-        cls, expenses: [BankExpense], output_path: Path
-    ) -> str:
-        logger.info(f"Exporting bank expenses to {output_path=}")
-        if not output_path.parent.exists():
-            output_path.parent.mkdir(exist_ok=True)
-        file = open(output_path, "w")
-        sorted_expenses = sorted(expenses, key=lambda exp: exp.date, reverse=True)
-        json_expenses = json.dumps(
-            [expense.__dict__ for expense in sorted_expenses],
-            ensure_ascii=False,
-            indent=4,
-        )
-        file.write(json_expenses)
-        file.close()
-        logger.success(f"Successfully written results to {output_path=}")
-        return json_expenses
-
 
 class BancoCttParser(BankStatementParser):
     sender_email: Final[str] = "documentos@bancoctt.pt"
     keywords: Final[str] = "Extrato"
+    service: Final[str] = "Banco CTT"
 
     @classmethod
     def fetch_expenses(cls) -> Iterable[BankExpense]:
@@ -52,62 +46,168 @@ class BancoCttParser(BankStatementParser):
         messages = GmailGateway.get_email_messages(
             sender_emails=cls.sender_email,
             keywords=cls.keywords,
-            max_results=1000,
             fetch_body=True,
         )
-        bank_expenses = []
-        for message in messages:
-            attachment_b64_str_content = GmailGateway.get_message_attachment(
-                message_id=message.id, attachment_id=message.attachments[0].id
+        statement_expenses = cls.parse_statements(messages)
+        return [expense for expenses in statement_expenses for expense in expenses]
+
+    @classmethod
+    def parse_statements(
+        cls,
+        messages: Iterable[GmailMessage],
+        workers: int = PARSE_PROCESS_MAX_WORKERS,
+        save_temp_files: bool = SAVE_STATEMENT_TEMP_FILES,
+        use_cache: bool = STATEMENT_CACHE_ENABLED,
+    ) -> List[List[BankExpense]]:
+        """
+        Downloads the statement attached to each message in parallel, and parses each
+        statement in a process pool as soon as it is downloaded. Statements are parsed
+        from memory; with 'save_temp_files' they are also written to TEMP_PATH for
+        debugging. Returns the expenses of each statement in message order, leaving out
+        statements that failed.
+        With 'use_cache', statements already parsed in earlier runs are neither downloaded
+        nor parsed again, matched by message ID or else by the hash of the PDF.
+        """
+        messages = [message for message in messages if message.attachments]
+        statement_expenses = [[] for _ in messages]
+        cache = StatementCache.get_instance() if use_cache else None
+        if cache is not None:
+            cached = cache.get_by_message_ids(message.id for message in messages)
+            for index, message in enumerate(messages):
+                statement_expenses[index] = cached.get(message.id, [])
+            logger.info(f"Found {len(cached)} of {len(messages)} statements in cache")
+            pending = [i for i, m in enumerate(messages) if m.id not in cached]
+        else:
+            pending = list(range(len(messages)))
+        if not pending:
+            return statement_expenses
+
+        parse_pool = (
+            ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
             )
+            if workers > 1
+            else ThreadPoolExecutor(max_workers=1)
+        )
+        with ThreadPoolExecutor(
+            max_workers=min(THREAD_POOL_MAX_WORKERS, len(pending))
+        ) as download_pool, parse_pool:
+            downloads = {
+                download_pool.submit(
+                    cls.download_statement, messages[index], save_temp_files
+                ): index
+                for index in pending
+            }
+            parses = {}
+            content_hashes = {}
+            for future in concurrent.futures.as_completed(downloads):
+                index = downloads[future]
+                message = messages[index]
+                try:
+                    content = future.result()
+                    content_hash = StatementCache.content_hash(content)
+                    cached_expenses = cache.get(content_hash) if cache else None
+                    if cached_expenses is not None:
+                        statement_expenses[index] = cached_expenses
+                        continue
+                    future_parse = parse_pool.submit(
+                        cls.parse_expenses_from_messages, content
+                    )
+                    parses[future_parse] = index
+                    content_hashes[index] = content_hash
+                except Exception as ex:
+                    logger.error(
+                        f"Error downloading statement with message_id={message.id}, error={ex}"
+                    )
+
+            for future in concurrent.futures.as_completed(parses):
+                index = parses[future]
+                message = messages[index]
+                try:
+                    statement_expenses[index] = future.result()
+                    if cache is not None:
+                        cache.put(
+                            content_hashes[index],
+                            message.id,
+                            message.attachments[0].id,
+                            statement_expenses[index],
+                        )
+                except Exception as ex:
+                    logger.error(
+                        f"Error parsing statement with message_id={message.id}, error={ex}"
+                    )
+
+        return statement_expenses
 
-            filename = messages[0].id
-            temp_filepath = TEMP_PATH / filename
+    @classmethod
+    def download_statement(
+        cls, message: GmailMessage, save_temp_file: bool = False
+    ) -> bytes:
+        attachment_b64_str_content = GmailGateway.get_message_attachment(
+            message_id=message.id, attachment_id=message.attachments[0].id
+        )
+        if save_temp_file:
             FileUtils.save_base64_pdf(
                 base64_string=attachment_b64_str_content,
-                file_path=temp_filepath,
-                message_id=filename,
+                file_path=TEMP_PATH / f"{message.id}.pdf",
+                message_id=message.id,
             )
-            expenses = cls.parse_expenses_from_messages(temp_filepath)
-            bank_expenses.append(expenses)
-
-        shutil.rmtree(TEMP_PATH)
-
-        return [item for sublist in bank_expenses for item in sublist]
+        return FileUtils.decode_base64(attachment_b64_str_content)
 
     @classmethod
-    def parse_expenses_from_messages(cls, pdf_statement: Path) -> Iterable[BankExpense]:
-        logger.info(f"Parsing Banco CTT statement for path={pdf_statement}")
-        transaction_lines = cls.get_rendered_text_from_pdf(pdf_statement)
+    def parse_expenses_from_messages(
+        cls, pdf_statement: Union[Path, bytes]
+    ) -> Iterable[BankExpense]:
+        """
+        Parses a statement given either its path or the PDF bytes, which are read from
+        memory without touching the disk. Each expense is keyed by the statement hash and
+        the index of its line, e.g. '<sha256>:3'.
+        """
+        if isinstance(pdf_statement, bytes):
+            logger.info(f"Parsing Banco CTT statement of {len(pdf_statement)} bytes")
+        else:
+            logger.info(f"Parsing Banco CTT statement for path={pdf_statement}")
+            pdf_statement = Path(pdf_statement).read_bytes()
+        content_hash = StatementCache.content_hash(pdf_statement)
         expenses = [
             BankExpense(
-                id=line.split(" ")[-3],
-                description=" ".join(line.split(" ")[2:-3]),
-                total_euros=line.split(" ")[-2],
-                date=cls.get_yyyy_mm_dd_date(line.split(" ")[1]),
+                id=match.group("id"),
+                description=match.group("description") or "",
+                total_euros=match.group("total"),
+                date=cls.get_yyyy_mm_dd_date(match.group("date")),
+                statement_line=f"{content_hash}:{index}",
             )
-            for line in transaction_lines
+            for index, match in enumerate(cls.iter_transaction_lines(pdf_statement))
         ]
+        logger.success(f"Extracted {len(expenses)} transaction lines")
 
         return expenses
 
     @classmethod
-    def get_rendered_text_from_pdf(cls, pdf_file: Path) -> Iterable[Iterable[str]]:
-        pdf = pdfplumber.open(pdf_file)
-        page_lines = [page.extract_text().split("\n") for page in pdf.pages]
-
-        transaction_lines = []
-        for page in page_lines:
-            for line in page:
-                pattern = re.compile(r"^\d\d-\d\d-\d\d\d\d \d\d-\d\d-\d\d\d\d")
-                matches = pattern.findall(line)
-                if len(matches) != 0:
-                    transaction_lines.append(line)
-
-        logger.success(f"Extracted transaction lines:")
-        for line in transaction_lines:
-            logger.success(line)
-        return transaction_lines
+    def iter_transaction_lines(
+        cls,
+        pdf_file: Union[Path, bytes],
+        crop_box: Optional[BoundingBox] = BANK_STATEMENT_CROP_BOX,
+    ) -> Iterator[re.Match]:
+        """
+        Extracts the text of one page at a time and yields the match of each transaction
+        line, releasing the page before moving on to the next one, so memory is bounded
+        by a single page. With 'crop_box' (x0, top, x1, bottom, in PDF points), only the
+        text within that area of each page, e.g. the transaction table, is extracted.
+        """
+        if isinstance(pdf_file, bytes):
+            pdf_file = BytesIO(pdf_file)
+        with pdfplumber.open(pdf_file) as pdf:
+            for page in pdf.pages:
+                try:
+                    region = page.crop(crop_box, strict=False) if crop_box else page
+                    for line in (region.extract_text() or "").split("\n"):
+                        match = BANCO_CTT_TRANSACTION_LINE.match(line)
+                        if match is not None:
+                            logger.debug(f"Extracted transaction line: {line}")
+                            yield match
+                finally:
+                    page.close()
 
     @classmethod
     def get_yyyy_mm_dd_date(cls, dd_mm_yyyy_date: str) -> str:
@@ -1,23 +1,27 @@
-import json
-import os
-import re
 from abc import ABC, abstractmethod
-from pathlib import Path
-from typing import Iterable, Optional, Final
+from typing import Iterable, Iterator, List, Optional, Final
 
-import html2text as html2text
-from alive_progress import alive_bar
 
-from gmail_fisher import get_logger, ROOT_DIR
+from gmail_fisher import get_logger
 from gmail_fisher.api.gateway import GmailGateway
+from gmail_fisher.data.dedup_index import DedupIndex
 from gmail_fisher.data.models import (
     GmailMessage,
     UberEatsExpense,
     BoltFoodExpense,
     FoodExpense,
+    FetchProfile,
+    MessageFormat,
 )
-from gmail_fisher.parsers import print_header
-from gmail_fisher.utils.json_utils import JsonUtils
+from gmail_fisher.parsers import print_header, progress_bar
+from gmail_fisher.parsers.html_extractor import HtmlEngine
+from gmail_fisher.parsers.patterns import (
+    BOLT_FOOD_RESTAURANT_DASH,
+    BOLT_FOOD_RESTAURANT_COMMA,
+    BOLT_FOOD_TOTAL,
+)
+from gmail_fisher.parsers.restaurant_filters import RestaurantFilters
+from gmail_fisher.utils.config import HTML_EXTRACTION_ENGINE
 
 logger = get_logger(__name__)
 
@@ -30,72 +34,78 @@ def apply_restaurant_filter(func):
 
 
 class FoodExpenseParser(ABC):
+    header: str
+
     @classmethod
     @abstractmethod
     def fetch_expenses(cls) -> Iterable[FoodExpense]:
         pass
 
     @classmethod
-    def serialize_expenses_to_json_file(
-        cls, expenses: [FoodExpense], output_path: str
-    ) -> str:
-        logger.info(f"Exporting food expenses to {output_path=}")
-        output_path = Path(output_path)
-        if not output_path.parent.exists():
-            output_path.parent.mkdir(exist_ok=True)
+    @abstractmethod
+    def fetch_messages(cls) -> Iterator[GmailMessage]:
+        pass
 
-        sorted_expenses = sorted(expenses, key=lambda exp: exp.date, reverse=True)
-        json_expenses = json.dumps(
-            [expense.__dict__ for expense in sorted_expenses],
-            ensure_ascii=False,
-            indent=4,
-        )
+    @classmethod
+    @abstractmethod
+    def iter_expenses_from_messages(
+        cls, gmail_messages: Iterable[GmailMessage]
+    ) -> Iterator[FoodExpense]:
+        pass
 
-        JsonUtils.write_to_json_file(json_expenses, output_path)
-        return json_expenses
+    @classmethod
+    def drop_duplicates(cls, expenses: Iterable[FoodExpense]) -> Iterator[FoodExpense]:
+        return DedupIndex.get_instance().drop_duplicates(expenses)
 
     @classmethod
     def apply_restaurant_filters(cls, string_value: str) -> str:
         """
         Apply filters by finding the filters dict key and replacing it by the dict value
         """
-        filters = JsonUtils.load_dict_from_json(
-            os.path.join(ROOT_DIR, "parsers/restaurant-filters.json")
-        )
-
-        for filter_key, filter_value in filters["replace"].items():
-            string_value = string_value.replace(filter_key, filter_value)
-        for trim_str in filters["trim"]:
-            string_value = string_value.replace(trim_str, "")
-
-        return string_value
+        return RestaurantFilters.get_instance().apply(string_value)
 
 
 class BoltFoodParser(FoodExpenseParser):
     sender_email: Final[str] = "portugal-food@bolt.eu"
     keywords: Final[str] = "Delivery from Bolt Food"
+    header: Final[str] = "🍕   Bolt Food"
+    html_engine: str = HTML_EXTRACTION_ENGINE
+    fetch_profile: Final[FetchProfile] = FetchProfile(
+        format=MessageFormat.FULL, fields="id,snippet,payload(headers,body,parts)"
+    )
 
     @classmethod
     def fetch_expenses(cls) -> Iterable[FoodExpense]:
-        print_header("🍕   Bolt Food")
-        messages = GmailGateway.get_email_messages(
+        print_header(cls.header)
+        return cls.drop_duplicates(
+            cls.iter_expenses_from_messages(cls.fetch_messages())
+        )
+
+    @classmethod
+    def fetch_messages(cls) -> Iterator[GmailMessage]:
+        return GmailGateway.iter_email_messages(
             sender_emails=cls.sender_email,
             keywords=cls.keywords,
-            max_results=1000,
             fetch_body=True,
+            profile=cls.fetch_profile,
         )
-        return cls.parse_expenses_from_messages(messages)
 
     @classmethod
     def parse_expenses_from_messages(
         cls, gmail_messages: Iterable[GmailMessage]
-    ) -> Iterable[BoltFoodExpense]:
-        expenses = []
-        num_messages = len(list(gmail_messages))
-        logger.info(
-            f"⏳  Mapping {num_messages} email messages to Bolt Food expenses..."
-        )
-        with alive_bar(num_messages) as bar:
+    ) -> List[BoltFoodExpense]:
+        return list(cls.iter_expenses_from_messages(gmail_messages))
+
+    @classmethod
+    def iter_expenses_from_messages(
+        cls, gmail_messages: Iterable[GmailMessage]
+    ) -> Iterator[BoltFoodExpense]:
+        """
+        Maps each message to a Bolt Food expense as soon as it is available.
+        """
+        num_expenses = 0
+        logger.info(f"⏳  Mapping email messages to Bolt Food expenses...")
+        with progress_bar(gmail_messages) as bar:
             for message in gmail_messages:
                 try:
                     expense = BoltFoodExpense(
@@ -104,30 +114,28 @@ class BoltFoodParser(FoodExpenseParser):
                         total=cls.get_total_payed(message=message),
                         date=cls.get_date(message),
                     )
-                    expenses.append(expense)
-                    bar()
                 except Exception as ex:
                     logger.warning(
                         f"Could not map food expense with subject={message.subject}, error={ex}"
                     )
+                    continue
+                finally:
+                    message.release_parsed_body()
+                num_expenses += 1
+                bar()
+                yield expense
 
-        logger.success(f"Successfully mapped {len(expenses)} Bolt Food expenses")
-        return expenses
+        logger.success(f"Successfully mapped {num_expenses} Bolt Food expenses")
 
     @classmethod
     @apply_restaurant_filter
     def get_restaurant(cls, message: GmailMessage) -> Optional[str]:
-        if re.search(r"From .* -", message.subject) is not None:
-            restaurant = re.search(r"From .* -", message.subject).group()[5:-2]
-        else:
-            if re.search(r"From .*,", message.subject) is not None:
-                restaurant = (
-                    re.search(r"From .*,", message.subject).group().split(",")[0][5:]
-                )
-            else:
-                raise Exception(
-                    f"Cannot match restaurant for subject={message.subject}"
-                )
+        match = BOLT_FOOD_RESTAURANT_DASH.search(
+            message.subject
+        ) or BOLT_FOOD_RESTAURANT_COMMA.search(message.subject)
+        if match is None:
+            raise Exception(f"Cannot match restaurant for subject={message.subject}")
+        restaurant = match.group("restaurant")
 
         if restaurant.__contains__("-"):
             restaurant = restaurant.split("-")[0].strip()
@@ -139,21 +147,30 @@ class BoltFoodParser(FoodExpenseParser):
         date_arr = message.subject.split(" ")[0].split("-")
         return f"{date_arr[2]}-{date_arr[1]}-{date_arr[0]}"
 
-    @staticmethod
-    def get_total_payed(message: GmailMessage) -> Optional[float]:
+    @classmethod
+    def get_total_payed(cls, message: GmailMessage) -> Optional[float]:
+        if cls.html_engine == HtmlEngine.TOKENIZER and message.body.__contains__(
+            "<html>"
+        ):
+            return cls.__get_total_payed_from_text_nodes(message)
+
         if message.body.__contains__("<html>"):
-            body = html2text.html2text(message.body)
-            body = body.split("**Total charged:**")[1]
+            body = message.body_text.split("**Total charged:**")[1]
         else:
             body = message.body
 
         try:
-            return float(
-                re.search(r"\*[0-9]*[0-9]+.[0-9][0-9]€\*", body)
-                .group(0)
-                .replace("€", "")
-                .replace("*", "")
-            )
+            return float(BOLT_FOOD_TOTAL.search(body).group("total"))
+        except Exception as ex:
+            logger.error(f"ERROR when fetching total payed {ex}")
+            return None
+
+    @classmethod
+    def __get_total_payed_from_text_nodes(
+        cls, message: GmailMessage
+    ) -> Optional[float]:
+        try:
+            return float(message.body_text_nodes.after("Total charged:").strip("€"))
         except Exception as ex:
             logger.error(f"ERROR when fetching total payed {ex}")
             return None
@@ -162,26 +179,41 @@ class BoltFoodParser(FoodExpenseParser):
 class UberEatsParser(FoodExpenseParser):
     sender_email: Final[str] = "uber.portugal@uber.com"
     keywords: Final[str] = "Total"
+    header: Final[str] = "🍕   Uber Eats"
+    fetch_profile: Final[FetchProfile] = FetchProfile(
+        format=MessageFormat.METADATA,
+        metadata_headers=("Date",),
+        fields="id,snippet,payload/headers",
+    )
 
     @classmethod
     def fetch_expenses(cls) -> Iterable[FoodExpense]:
         logger.info("Fetching UberEats food expenses")
-        print_header("🍕   Uber Eats")
-        messages = GmailGateway.get_email_messages(
+        print_header(cls.header)
+        return cls.drop_duplicates(
+            cls.iter_expenses_from_messages(cls.fetch_messages())
+        )
+
+    @classmethod
+    def fetch_messages(cls) -> Iterator[GmailMessage]:
+        return GmailGateway.iter_email_messages(
             sender_emails=cls.sender_email,
             keywords=cls.keywords,
-            max_results=1000,
             fetch_body=False,
+            profile=cls.fetch_profile,
         )
-        return cls.parse_expenses_from_messages(messages)
 
     @classmethod
     def parse_expenses_from_messages(
         cls, gmail_messages: Iterable[GmailMessage]
-    ) -> Iterable[UberEatsExpense]:
-        expenses = []
-        num_messages = len(list(gmail_messages))
-        with alive_bar(num_messages) as bar:
+    ) -> List[UberEatsExpense]:
+        return list(cls.iter_expenses_from_messages(gmail_messages))
+
+    @classmethod
+    def iter_expenses_from_messages(
+        cls, gmail_messages: Iterable[GmailMessage]
+    ) -> Iterator[UberEatsExpense]:
+        with progress_bar(gmail_messages) as bar:
             for message in gmail_messages:
                 try:
                     expense = UberEatsExpense(
@@ -190,15 +222,13 @@ class UberEatsParser(FoodExpenseParser):
                         total=cls.get_total_payed(message),
                         date=cls.get_date(message),
                     )
-
-                    expenses.append(expense)
-                    bar()
                 except IndexError:
                     logger.warning(
                         f"Could not map food expense with subject='{message.subject}'"
                     )
-
-        return expenses
+                    continue
+                bar()
+                yield expense
 
     @staticmethod
     @apply_restaurant_filter
@@ -0,0 +1,15 @@
+from typing import List
+
+
+class HtmlEngine:
+    HTML2TEXT = "html2text"
+    TOKENIZER = "tokenizer"
+
+
+def get_body_lines(message, engine: str) -> List[str]:
+    """
+    Lines of a message body to scan for receipt fields, as rendered by 'engine'.
+    """
+    if engine == HtmlEngine.TOKENIZER:
+        return message.body_text_nodes.nodes
+    return message.body_lines
@@ -0,0 +1,70 @@
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Iterable, Iterator, List
+
+from gmail_fisher import get_logger
+from gmail_fisher.data.models import GmailMessage
+from gmail_fisher.parsers import disable_progress_bars
+from gmail_fisher.utils.config import (
+    PARSE_PROCESS_MAX_WORKERS,
+    PARSE_PROCESS_CHUNK_SIZE,
+    PARSE_PROCESS_MIN_MESSAGES,
+)
+
+logger = get_logger(__name__)
+
+
+def parse_expenses_in_processes(
+    parser: Any,
+    gmail_messages: Iterable[GmailMessage],
+    workers: int = PARSE_PROCESS_MAX_WORKERS,
+    chunk_size: int = PARSE_PROCESS_CHUNK_SIZE,
+    min_messages: int = PARSE_PROCESS_MIN_MESSAGES,
+) -> Iterator[Any]:
+    """
+    Maps messages to expenses with 'parser' as they stream in, handing the rest of large
+    mailboxes to a pool of worker processes, so HTML to text conversion and regex
+    matching run on every core instead of behind the GIL. The first 'min_messages' are
+    parsed in the current process while they are fetched, as pickling messages to the
+    workers costs more than it saves for small mailboxes, and only the messages after
+    them are collected and parsed in ordered chunks. The merged expenses go through the
+    parser's 'drop_duplicates', so results match parsing in the current process.
+    """
+    gmail_messages = iter(gmail_messages)
+    in_process_limit = max(min_messages, 1) if workers > 1 else None
+
+    def iter_expenses() -> Iterator[Any]:
+        yield from parser.iter_expenses_from_messages(
+            itertools.islice(gmail_messages, in_process_limit)
+        )
+        remaining = list(gmail_messages)
+        if remaining:
+            yield from _parse_in_processes(parser, remaining, workers, chunk_size)
+
+    yield from parser.drop_duplicates(iter_expenses())
+
+
+def _parse_in_processes(
+    parser: Any, gmail_messages: List[GmailMessage], workers: int, chunk_size: int
+) -> Iterator[Any]:
+    chunks = [
+        gmail_messages[i : i + chunk_size]
+        for i in range(0, len(gmail_messages), chunk_size)
+    ]
+    logger.info(
+        f"Parsing {len(gmail_messages)} messages in {len(chunks)} chunks "
+        f"with {workers} processes"
+    )
+    # Spawned rather than forked, since fetch threads are still running at this point
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(chunks)),
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=disable_progress_bars,
+    ) as pool:
+        for expenses in pool.map(_parse_chunk, [parser] * len(chunks), chunks):
+            yield from expenses
+
+
+def _parse_chunk(parser: Any, gmail_messages: List[GmailMessage]) -> List[Any]:
+    return list(parser.iter_expenses_from_messages(gmail_messages))
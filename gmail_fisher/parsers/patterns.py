@@ -0,0 +1,28 @@
+"""
+Compiled extractors shared by the parsers. Each pattern is compiled once at import time and
+captures the value it extracts in a named group, so callers search once and read the group
+instead of searching again to get the match.
+"""
+import re
+from typing import Final, Pattern
+
+# BOLT FOOD
+BOLT_FOOD_RESTAURANT_DASH: Final[Pattern] = re.compile(r"From (?P<restaurant>.*) -")
+BOLT_FOOD_RESTAURANT_COMMA: Final[Pattern] = re.compile(
+    r"From (?P<restaurant>[^,\n]*),"
+)
+BOLT_FOOD_TOTAL: Final[Pattern] = re.compile(r"\*(?P<total>[0-9]+.[0-9][0-9])€\*")
+
+# BOLT
+BOLT_DISTANCE_KM: Final[Pattern] = re.compile(r"distance (?P<distance_km>[^ ]*).* km")
+BOLT_TRIP_TIMES: Final[Pattern] = re.compile(
+    r"[0-9][0-9]:[0-9][0-9] .* [0-9][0-9]:[0-9][0-9]"
+)
+BOLT_TOTAL: Final[Pattern] = re.compile(r"Total (?P<total>[^€\n]*)€")
+CONTAINS_YEAR: Final[Pattern] = re.compile(r".*[1-3][0-9]{3}")
+
+# BANCO CTT
+BANCO_CTT_TRANSACTION_LINE: Final[Pattern] = re.compile(
+    r"^(?P<value_date>\d\d-\d\d-\d\d\d\d) (?P<date>\d\d-\d\d-\d\d\d\d) "
+    r"(?:(?P<description>.*) )?(?P<id>[^ ]*) (?P<total>[^ ]*) (?P<balance>[^ ]*)$"
+)
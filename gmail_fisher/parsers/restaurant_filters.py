@@ -0,0 +1,65 @@
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, Final, Optional
+
+from gmail_fisher import get_logger, ROOT_DIR
+from gmail_fisher.utils.json_utils import JsonUtils
+
+logger = get_logger(__name__)
+
+RESTAURANT_FILTERS_PATH: Final[Path] = (
+    Path(ROOT_DIR) / "parsers/restaurant-filters.json"
+)
+
+
+class RestaurantFilters:
+    """
+    Replace and trim filters of restaurant names, compiled into a single regex alternation
+    so every filter is applied in one scan of the string. Longer filters are tried first,
+    so a filter that contains another one (e.g. '® (Saldanha)' and '®') wins.
+    """
+
+    __instances: Dict[Path, "RestaurantFilters"] = {}
+    __instances_lock: Final[threading.Lock] = threading.Lock()
+
+    def __init__(self, replacements: Dict[str, str], mtime: Optional[float] = None):
+        self.replacements = replacements
+        self.mtime = mtime
+        self.pattern = re.compile(
+            "|".join(
+                re.escape(key)
+                for key in sorted(replacements, key=len, reverse=True)
+                if key
+            )
+        )
+
+    @classmethod
+    def load(cls, path: Path = RESTAURANT_FILTERS_PATH) -> "RestaurantFilters":
+        mtime = os.stat(path).st_mtime
+        filters = JsonUtils.load_dict_from_json(path)
+        replacements = {trim_str: "" for trim_str in filters["trim"]}
+        replacements.update(filters["replace"])
+        logger.info(f"Loaded {len(replacements)} restaurant filters from {path=}")
+        return RestaurantFilters(replacements, mtime)
+
+    @classmethod
+    def get_instance(cls, path: Path = RESTAURANT_FILTERS_PATH) -> "RestaurantFilters":
+        """
+        Returns the filters compiled from 'path', reloading them only once the file's
+        modification time changes.
+        """
+        mtime = os.stat(path).st_mtime
+        with cls.__instances_lock:
+            instance = cls.__instances.get(path)
+            if instance is None or instance.mtime != mtime:
+                instance = cls.__instances[path] = RestaurantFilters.load(path)
+            return instance
+
+    def apply(self, string_value: str) -> str:
+        if not self.replacements:
+            return string_value
+        return self.pattern.sub(
+            lambda match: self.replacements[match.group(0)], string_value
+        )
@@ -1,77 +1,98 @@
-import json
-import re
 from datetime import datetime
-from typing import Iterable, Tuple, Final
+from typing import Iterable, Iterator, List, Tuple, Final
 
 import dateutil
-import html2text
-from alive_progress import alive_bar
 
 from gmail_fisher import get_logger
 from gmail_fisher.api.gateway import GmailGateway
+from gmail_fisher.data.dedup_index import DedupIndex
 from gmail_fisher.data.models import (
     TransportationExpense,
     BoltTransportationExpense,
     GmailMessage,
     UberTransportationExpense,
+    FetchProfile,
+    MessageFormat,
 )
-from gmail_fisher.parsers import print_header
+from gmail_fisher.parsers import print_header, progress_bar
+from gmail_fisher.parsers.html_extractor import HtmlEngine, get_body_lines
+from gmail_fisher.parsers.patterns import (
+    BOLT_DISTANCE_KM,
+    BOLT_TRIP_TIMES,
+    BOLT_TOTAL,
+    CONTAINS_YEAR,
+)
+from gmail_fisher.utils.config import HTML_EXTRACTION_ENGINE
 
 logger = get_logger(__name__)
 
 
 class TransportationExpenseParser:
+    header: str
+
     @classmethod
     def fetch_expenses(cls) -> Iterable[TransportationExpense]:
         pass
 
     @classmethod
-    def serialize_expenses_to_json_file(
-        cls, expenses: [TransportationExpense], output_path: str
-    ) -> str:
-        file = open(output_path, "w")
-        sorted_expenses = sorted(expenses, key=lambda exp: exp.date, reverse=True)
-        json_expenses = json.dumps(
-            [expense.__dict__ for expense in sorted_expenses],
-            ensure_ascii=False,
-            indent=4,
-        )
-        file.write(json_expenses)
-        file.close()
-        logger.success(f"Successfully written results to {output_path=}")
-        return json_expenses
+    def fetch_messages(cls) -> Iterator[GmailMessage]:
+        pass
+
+    @classmethod
+    def iter_expenses_from_messages(
+        cls, gmail_messages: Iterable[GmailMessage]
+    ) -> Iterator[TransportationExpense]:
+        pass
+
+    @classmethod
+    def drop_duplicates(
+        cls, expenses: Iterable[TransportationExpense]
+    ) -> Iterator[TransportationExpense]:
+        return DedupIndex.get_instance().drop_duplicates(expenses)
 
 
 class UberParser(TransportationExpenseParser):
     sender_email: Final[str] = "noreply@uber.com"
     keywords: Final[str] = "Uber Receipts ride"
+    header: Final[str] = "🚕   Uber"
+    html_engine: str = HTML_EXTRACTION_ENGINE
+    fetch_profile: Final[FetchProfile] = FetchProfile(
+        format=MessageFormat.FULL, fields="id,snippet,payload(headers,body,parts)"
+    )
 
     @classmethod
     def fetch_expenses(cls) -> Iterable[UberTransportationExpense]:
-        print_header("🚕   Uber")
         logger.info("Fetching Uber transportation expenses")
-        messages = GmailGateway.get_email_messages(
+        print_header(cls.header)
+        return cls.drop_duplicates(
+            cls.iter_expenses_from_messages(cls.fetch_messages())
+        )
+
+    @classmethod
+    def fetch_messages(cls) -> Iterator[GmailMessage]:
+        return GmailGateway.iter_email_messages(
             sender_emails=cls.sender_email,
             keywords=cls.keywords,
-            max_results=1000,
             fetch_body=True,
+            profile=cls.fetch_profile,
         )
-        return cls.parse_expenses_from_messages(messages)
 
     @classmethod
     def parse_expenses_from_messages(
         cls, gmail_messages: Iterable[GmailMessage]
-    ) -> Iterable[UberTransportationExpense]:
-        expenses = []
-        num_messages = len(list(gmail_messages))
-        logger.info(
-            f"⏳  Mapping {num_messages} email messages to Uber transportation expenses..."
-        )
-        with alive_bar(num_messages) as bar:
+    ) -> List[UberTransportationExpense]:
+        return list(cls.iter_expenses_from_messages(gmail_messages))
+
+    @classmethod
+    def iter_expenses_from_messages(
+        cls, gmail_messages: Iterable[GmailMessage]
+    ) -> Iterator[UberTransportationExpense]:
+        logger.info(f"⏳  Mapping email messages to Uber transportation expenses...")
+        with progress_bar(gmail_messages) as bar:
             for message in gmail_messages:
                 try:
                     from_address, to_address = cls.__get_addresses(message)
-                    current_expense = UberTransportationExpense(
+                    expense = UberTransportationExpense(
                         id=message.id,
                         distance_km=cls.__get_distance_km(message),
                         from_address=from_address,
@@ -79,21 +100,15 @@ class UberParser(TransportationExpenseParser):
                         total=cls.__get_total_payed(message),
                         date=cls.__get_date(message),
                     )
-                    if not cls.__already_contains_uber_expense(
-                        expenses, current_expense
-                    ):
-                        expenses.append(current_expense)
-                    else:
-                        logger.warning(
-                            f"Detected duplicate expense={current_expense}, will ignore..."
-                        )
-                    bar()
                 except IndexError:
                     logger.error(
                         f"Error fetching Bolt expense from email message with subject={message.subject}"
                     )
-
-        return expenses
+                    continue
+                finally:
+                    message.release_parsed_body()
+                bar()
+                yield expense
 
     @classmethod
     def __get_addresses(cls, message):
@@ -103,7 +118,7 @@ class UberParser(TransportationExpenseParser):
     def __get_distance_km(cls, message):
         distance_duration_str = [
             l
-            for l in html2text.html2text(message.body).split("\n")
+            for l in get_body_lines(message, cls.html_engine)
             if l.__contains__("kilometres")
         ]
         distance_str = [
@@ -133,77 +148,77 @@ class UberParser(TransportationExpenseParser):
                 f"Could not match date with subject='{message.subject}', error={e}"
             )
 
-    @classmethod
-    def __already_contains_uber_expense(
-        cls,
-        expenses: Iterable[UberTransportationExpense],
-        expense: UberTransportationExpense,
-    ) -> bool:
-        for exp in expenses:
-            if expense.same_expense(exp):
-                return True
-        return False
-
 
 class BoltParser(TransportationExpenseParser):
     sender_email: Final[str] = "receipts-portugal@bolt.eu"
     keywords: Final[str] = "bolt trip"
+    header: Final[str] = "🚕   Bolt"
+    html_engine: str = HTML_EXTRACTION_ENGINE
+    fetch_profile: Final[FetchProfile] = FetchProfile(
+        format=MessageFormat.FULL, fields="id,snippet,payload(headers,body,parts)"
+    )
 
     @classmethod
     def fetch_expenses(cls) -> Iterable[BoltTransportationExpense]:
-        print_header("🚕   Bolt")
         logger.info("Fetching Bolt transportation expenses")
-        messages = GmailGateway.get_email_messages(
+        print_header(cls.header)
+        return cls.drop_duplicates(
+            cls.iter_expenses_from_messages(cls.fetch_messages())
+        )
+
+    @classmethod
+    def fetch_messages(cls) -> Iterator[GmailMessage]:
+        return GmailGateway.iter_email_messages(
             sender_emails=cls.sender_email,
             keywords=cls.keywords,
-            max_results=1000,
             fetch_body=True,
+            profile=cls.fetch_profile,
         )
-        return cls.parse_expenses_from_messages(messages)
 
     @classmethod
     def parse_expenses_from_messages(
         cls, gmail_messages: Iterable[GmailMessage]
-    ) -> Iterable[BoltTransportationExpense]:
-        expenses = []
-        num_messages = len(list(gmail_messages))
-        logger.info(
-            f"⏳  Mapping {num_messages} email messages to Bolt transportation expenses..."
-        )
-        with alive_bar(num_messages) as bar:
+    ) -> List[BoltTransportationExpense]:
+        return list(cls.iter_expenses_from_messages(gmail_messages))
+
+    @classmethod
+    def iter_expenses_from_messages(
+        cls, gmail_messages: Iterable[GmailMessage]
+    ) -> Iterator[BoltTransportationExpense]:
+        logger.info(f"⏳  Mapping email messages to Bolt transportation expenses...")
+        with progress_bar(gmail_messages) as bar:
             for message in gmail_messages:
                 try:
                     from_address, to_address = cls.__get_addresses(message)
-                    expenses.append(
-                        BoltTransportationExpense(
-                            id=message.id,
-                            distance_km=cls.__get_distance_km(message),
-                            from_address=from_address,
-                            to_address=to_address,
-                            total=cls.__get_total_payed(message),
-                            date=cls.__get_date(message),
-                        )
+                    expense = BoltTransportationExpense(
+                        id=message.id,
+                        distance_km=cls.__get_distance_km(message),
+                        from_address=from_address,
+                        to_address=to_address,
+                        total=cls.__get_total_payed(message),
+                        date=cls.__get_date(message),
                     )
-                    bar()
                 except IndexError:
                     logger.error(
                         f"Error fetching Bolt expense from email message with subject={message.subject}"
                     )
-
-        return expenses
+                    continue
+                finally:
+                    message.release_parsed_body()
+                bar()
+                yield expense
 
     @classmethod
     def __get_distance_km(cls, message) -> int:
-        match = 0
         try:
-            if re.search("distance .* km", message.subject) is not None:
-                return int(
-                    re.search("distance .* km", message.subject).group().split(" ")[1]
-                )
+            match = BOLT_DISTANCE_KM.search(message.subject)
+            if match is not None:
+                return int(match.group("distance_km"))
             else:
-                body = html2text.html2text(message.body)
                 lines_with_distances = [
-                    line for line in body.split("\n") if line.__contains__("km")
+                    line
+                    for line in get_body_lines(message, cls.html_engine)
+                    if line.__contains__("km")
                 ]
                 return int(lines_with_distances[0].split("•")[1].split("km")[0])
         except Exception as e:
@@ -215,27 +230,22 @@ class BoltParser(TransportationExpenseParser):
     def __get_addresses(cls, message) -> Tuple[str, str]:
         from_address, to_address = "", ""
         try:
-            if (
-                re.search(
-                    "[0-9][0-9]:[0-9][0-9] .* [0-9][0-9]:[0-9][0-9]", message.subject
-                )
-                is not None
-            ):
-                both_addresses = re.search(
-                    "[0-9][0-9]:[0-9][0-9] .* [0-9][0-9]:[0-9][0-9]", message.subject
-                ).group()
+            trip_times = BOLT_TRIP_TIMES.search(message.subject)
+            if trip_times is not None:
+                both_addresses = trip_times.group()
                 from_address = both_addresses.split(":")[1][
                     3 : (len(both_addresses.split(":")[1]) - 3)
                 ]
                 to_address = both_addresses.split(":")[2][
                     3 : (len(both_addresses.split(":")[2]) - 3)
                 ]
+            elif cls.html_engine == HtmlEngine.TOKENIZER:
+                from_address = message.body_text_nodes.after("Pickup")
+                to_address = message.body_text_nodes.after("Dropoff")
             else:
-                pickup_and_dropoff = (
-                    html2text.html2text(message.body)
-                    .split("Pickup:  \n--")[1]
-                    .split("\n|  \n---")[0]
-                )
+                pickup_and_dropoff = message.body_text.split("Pickup:  \n--")[1].split(
+                    "\n|  \n---"
+                )[0]
                 locations_array = [
                     blob.strip().replace("\n", "")
                     for blob in pickup_and_dropoff.split("|  |")
@@ -251,19 +261,18 @@ class BoltParser(TransportationExpenseParser):
 
     @classmethod
     def __get_total_payed(cls, message) -> float:
-        match = 0
         try:
-            if re.search("Total .*€", message.subject) is not None:
-                return float(
-                    re.search("Total .*€", message.subject)
-                    .group()
-                    .split("Total ")[1]
-                    .split("€")[0]
-                )
+            match = BOLT_TOTAL.search(message.subject)
+            if match is not None:
+                return float(match.group("total"))
+            elif cls.html_engine == HtmlEngine.TOKENIZER:
+                total = message.body_text_nodes.after("Total", offset=0)
+                if not total.__contains__("€"):
+                    total = message.body_text_nodes.after("Total")
+                return float(total.split(":")[-1].strip().split("€")[0])
             else:
-                body = html2text.html2text(message.body)
                 lines_with_totals = [
-                    line for line in body.split("\n") if line.__contains__("Total")
+                    line for line in message.body_lines if line.__contains__("Total")
                 ]
                 return float(lines_with_totals[0].split(":")[1].strip().split("€")[0])
         except Exception as e:
@@ -274,7 +283,7 @@ class BoltParser(TransportationExpenseParser):
     @classmethod
     def __get_date(cls, message) -> str:
         try:
-            if re.match(".*[1-3][0-9]{3}", message.subject) is not None:
+            if CONTAINS_YEAR.match(message.subject) is not None:
                 return str(
                     datetime(
                         int(message.subject[0:10].split(".")[2]),
@@ -285,8 +294,8 @@ class BoltParser(TransportationExpenseParser):
             else:
                 lines_with_dates = [
                     line
-                    for line in html2text.html2text(message.body).split("\n")
-                    if re.match(".*[1-3][0-9]{3}", line)
+                    for line in get_body_lines(message, cls.html_engine)
+                    if CONTAINS_YEAR.match(line)
                 ]
                 return str(dateutil.parser.parse(lines_with_dates[0]).date())
         except Exception as e:
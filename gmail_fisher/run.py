@@ -23,32 +23,92 @@ def save_attachments_command(sender_email: str, keywords: str):
 
 @click.command()
 @click.option("--output-filepath", help="File path of the output")
-def export_uber_eats_expenses_command(output_filepath: str):
-    export_food_expenses(FoodServiceType.UBER_EATS, output_filepath)
+@click.option(
+    "--merge", is_flag=True, help="Merge new expenses into the existing output"
+)
+@click.option(
+    "--partitioned",
+    is_flag=True,
+    help="Write the output as a directory of service/year/month partitions",
+)
+def export_uber_eats_expenses_command(
+    output_filepath: str, merge: bool, partitioned: bool
+):
+    export_food_expenses(
+        FoodServiceType.UBER_EATS, output_filepath, merge=merge, partitioned=partitioned
+    )
 
 
 @click.command()
 @click.option("--output-filepath", help="File path of the output")
-def export_bolt_food_expenses_command(output_filepath: str):
-    export_food_expenses(FoodServiceType.BOLT_FOOD, output_filepath)
+@click.option(
+    "--merge", is_flag=True, help="Merge new expenses into the existing output"
+)
+@click.option(
+    "--partitioned",
+    is_flag=True,
+    help="Write the output as a directory of service/year/month partitions",
+)
+def export_bolt_food_expenses_command(
+    output_filepath: str, merge: bool, partitioned: bool
+):
+    export_food_expenses(
+        FoodServiceType.BOLT_FOOD, output_filepath, merge=merge, partitioned=partitioned
+    )
 
 
 @click.command()
 @click.option("--output-filepath", help="File path of the output")
-def export_food_expenses_command(output_filepath: str):
-    export_food_expenses(FoodServiceType.ALL, Path(output_filepath), upload_s3=True)
+@click.option(
+    "--merge", is_flag=True, help="Merge new expenses into the existing output"
+)
+@click.option(
+    "--partitioned",
+    is_flag=True,
+    help="Write the output as a directory of service/year/month partitions",
+)
+def export_food_expenses_command(output_filepath: str, merge: bool, partitioned: bool):
+    export_food_expenses(
+        FoodServiceType.ALL,
+        Path(output_filepath),
+        upload_s3=True,
+        merge=merge,
+        partitioned=partitioned,
+    )
 
 
 @click.command()
 @click.option("--output-filepath", help="File path of the output")
-def export_bank_expenses_command(output_filepath: str):
-    export_bank_expenses(Path(output_filepath), upload_s3=True)
+@click.option(
+    "--merge", is_flag=True, help="Merge new expenses into the existing output"
+)
+@click.option(
+    "--partitioned",
+    is_flag=True,
+    help="Write the output as a directory of service/year/month partitions",
+)
+def export_bank_expenses_command(output_filepath: str, merge: bool, partitioned: bool):
+    export_bank_expenses(
+        Path(output_filepath), upload_s3=True, merge=merge, partitioned=partitioned
+    )
 
 
 @click.command()
 @click.option("--output-filepath", help="File path of the output")
-def export_transport_expenses_command(output_filepath: str):
-    export_transport_expenses(Path(output_filepath), upload_s3=True)
+@click.option(
+    "--merge", is_flag=True, help="Merge new expenses into the existing output"
+)
+@click.option(
+    "--partitioned",
+    is_flag=True,
+    help="Write the output as a directory of service/year/month partitions",
+)
+def export_transport_expenses_command(
+    output_filepath: str, merge: bool, partitioned: bool
+):
+    export_transport_expenses(
+        Path(output_filepath), upload_s3=True, merge=merge, partitioned=partitioned
+    )
 
 
 @click.command()
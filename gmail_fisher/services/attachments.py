@@ -14,7 +14,7 @@ logger = logging.getLogger(__name__)
 
 def export_email_attachments(sender_email: str, keywords: str):
     logger.info(f"Exporting email attachments with {sender_email=}, {keywords=}")
-    messages = GmailGateway.get_email_messages(sender_email, keywords, 1000)
+    messages = GmailGateway.get_email_messages(sender_email, keywords)
     __export_pdf_attachments(messages)
 
 
@@ -0,0 +1,41 @@
+import logging
+from pathlib import Path
+from typing import Any, Iterable
+
+from gmail_fisher.data.partitions import export_partitioned_expenses
+from gmail_fisher.data.s3_uploader import S3BucketUploader, UploadStatus
+from gmail_fisher.data.serializer import export_expenses
+
+logger = logging.getLogger(__name__)
+
+
+def export_and_upload_expenses(
+    expenses: Iterable[Any],
+    output_path: Path,
+    default_service: str,
+    upload_s3: bool = False,
+    merge: bool = False,
+    partitioned: bool = False,
+):
+    """
+    Exports expenses to the 'output_path' file or, when 'partitioned', to date partitions
+    under the 'output_path' directory, and uploads what changed to S3. Raises a
+    RuntimeError if any upload failed, so the export exits with an error.
+    """
+    output_path = Path(output_path)
+    if partitioned:
+        changed_paths = export_partitioned_expenses(
+            expenses, output_path, default_service, merge
+        )
+        if upload_s3:
+            report = S3BucketUploader().upload_partitions(output_path, changed_paths)
+            if not report.succeeded:
+                raise RuntimeError(f"Failed to upload partitions {report.failed}")
+    else:
+        changed = export_expenses(expenses, output_path, merge)
+        if upload_s3 and changed:
+            status = S3BucketUploader().upload(
+                filepath=output_path, key=output_path.name
+            )
+            if status == UploadStatus.FAILED:
+                raise RuntimeError(f"Failed to upload {output_path=}")
@@ -1,39 +1,41 @@
 import logging
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, Final, Tuple, Type
 
 from gmail_fisher.data.models import FoodExpense, FoodServiceType
-from gmail_fisher.data.s3_uploader import S3BucketUploader
 from gmail_fisher.parsers.food import BoltFoodParser, UberEatsParser, FoodExpenseParser
+from gmail_fisher.services.exports import export_and_upload_expenses
+from gmail_fisher.services.providers import fetch_expenses_from_providers
 
 logger = logging.getLogger(__name__)
 
+FOOD_PARSERS: Final[Tuple[Type[FoodExpenseParser], ...]] = (
+    BoltFoodParser,
+    UberEatsParser,
+)
+
 
 def get_food_expenses() -> Iterable[FoodExpense]:
-    return list(BoltFoodParser.fetch_expenses()) + list(UberEatsParser.fetch_expenses())
+    return fetch_expenses_from_providers(FOOD_PARSERS)
 
 
 def export_food_expenses(
-    service_type: FoodServiceType, output_path: Path, upload_s3: bool = False
+    service_type: FoodServiceType,
+    output_path: Path,
+    upload_s3: bool = False,
+    merge: bool = False,
+    partitioned: bool = False,
 ):
     logger.info(f"Exporting food expenses with {service_type=}, {output_path=}")
 
     if service_type is FoodServiceType.UBER_EATS:
-        FoodExpenseParser.serialize_expenses_to_json_file(
-            expenses=UberEatsParser.fetch_expenses(), output_path=str(output_path)
-        )
+        expenses = UberEatsParser.fetch_expenses()
     elif service_type is FoodServiceType.BOLT_FOOD:
-        FoodExpenseParser.serialize_expenses_to_json_file(
-            expenses=BoltFoodParser.fetch_expenses(), output_path=str(output_path)
-        )
+        expenses = BoltFoodParser.fetch_expenses()
     elif service_type is FoodServiceType.ALL:
-        FoodExpenseParser.serialize_expenses_to_json_file(
-            expenses=list(BoltFoodParser.fetch_expenses())
-            + list(UberEatsParser.fetch_expenses()),
-            output_path=str(output_path),
-        )
+        expenses = fetch_expenses_from_providers(FOOD_PARSERS)
     else:
         raise RuntimeError(f"Invalid food service type {service_type=}")
-
-    if upload_s3:
-        S3BucketUploader().upload(filepath=output_path, key=output_path.name)
+    export_and_upload_expenses(
+        expenses, output_path, service_type, upload_s3, merge, partitioned
+    )
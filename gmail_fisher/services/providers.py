@@ -0,0 +1,32 @@
+import concurrent
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Any
+
+from gmail_fisher.parsers import print_header
+from gmail_fisher.parsers.multiprocess import parse_expenses_in_processes
+
+logger = logging.getLogger(__name__)
+
+
+def fetch_expenses_from_providers(parsers: Iterable[Any]) -> List[Any]:
+    """
+    Streams the messages of every provider parser concurrently, with one consumer per
+    provider mapping its messages to expenses as they arrive, in worker processes for
+    large mailboxes. Gmail API calls of all providers go through the same
+    AdaptiveScheduler, so they share one quota and concurrency budget.
+    """
+    parsers = list(parsers)
+    expenses = []
+    with ThreadPoolExecutor(max_workers=len(parsers)) as pool:
+        futures = [pool.submit(parse_provider_expenses, parser) for parser in parsers]
+        for future in concurrent.futures.as_completed(futures):
+            expenses.extend(future.result())
+
+    logger.info(f"Merged {len(expenses)} expenses from {len(parsers)} providers")
+    return expenses
+
+
+def parse_provider_expenses(parser: Any) -> List[Any]:
+    print_header(parser.header)
+    return list(parse_expenses_in_processes(parser, parser.fetch_messages()))
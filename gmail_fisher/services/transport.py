@@ -1,25 +1,38 @@
 import logging
 from pathlib import Path
+from typing import Final, Tuple, Type
 
-from gmail_fisher.data.s3_uploader import S3BucketUploader
 from gmail_fisher.parsers.transportation import (
     TransportationExpenseParser,
     BoltParser,
     UberParser,
 )
+from gmail_fisher.services.exports import export_and_upload_expenses
+from gmail_fisher.services.providers import fetch_expenses_from_providers
 
 logger = logging.getLogger(__name__)
 
+TRANSPORT_SERVICE: Final[str] = "Transport"
+TRANSPORT_PARSERS: Final[Tuple[Type[TransportationExpenseParser], ...]] = (
+    BoltParser,
+    UberParser,
+)
 
-def export_transport_expenses(output_path: Path, upload_s3: bool = False):
+
+def export_transport_expenses(
+    output_path: Path,
+    upload_s3: bool = False,
+    merge: bool = False,
+    partitioned: bool = False,
+):
     logger.info(f"Exporting transportation expenses with {output_path=}")
 
-    transport_expenses = list(
-        BoltParser.fetch_expenses() + list(UberParser.fetch_expenses())
-    )
-    TransportationExpenseParser.serialize_expenses_to_json_file(
-        expenses=transport_expenses, output_path=str(output_path)
+    transport_expenses = fetch_expenses_from_providers(TRANSPORT_PARSERS)
+    export_and_upload_expenses(
+        transport_expenses,
+        output_path,
+        TRANSPORT_SERVICE,
+        upload_s3,
+        merge,
+        partitioned,
     )
-
-    if upload_s3:
-        S3BucketUploader().upload(filepath=output_path, key=output_path.name)
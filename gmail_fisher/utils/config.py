@@ -1,5 +1,6 @@
+import os
 from pathlib import Path
-from typing import Final
+from typing import Final, Tuple, Dict, Optional
 
 # LOGGING
 LOG_LEVEL: Final[str] = "INFO"
@@ -8,11 +9,70 @@ LOG_FORMAT: Final[str] = "%(asctime)s [%(name)s] <%(levelname)s> %(message)s"
 # GMAIL GATEWAY
 GMAIL_READ_ONLY_SCOPE: Final[str] = "https://www.googleapis.com/auth/gmail.readonly"
 LIST_MESSAGES_MAX_RESULTS: Final[int] = 1000
+LIST_MESSAGES_PAGE_SIZE: Final[int] = 500
+BATCH_REQUEST_MAX_SIZE: Final[int] = 100
+BATCH_REQUEST_MAX_RETRIES: Final[int] = 3
+# 'messages.get' calls per batch request when fetching messages, or None to fetch each
+# message with its own request
+MESSAGE_BATCH_SIZE: Final[Optional[int]] = None
+# Default and largest number of messages a '/messages' request lists and fetches
+MESSAGES_ENDPOINT_DEFAULT_RESULTS: Final[int] = 100
+MESSAGES_ENDPOINT_MAX_RESULTS: Final[int] = 1000
+RETRYABLE_HTTP_STATUS_CODES: Final[Tuple[int, ...]] = (429, 500, 502, 503, 504)
+
+# RATE LIMITING
+GMAIL_QUOTA_UNITS_PER_SECOND: Final[int] = 250
+GMAIL_QUOTA_UNITS: Final[Dict[str, int]] = {
+    "messages.list": 5,
+    "messages.get": 5,
+    "messages.attachments.get": 5,
+    "history.list": 2,
+    "getProfile": 1,
+}
+RETRY_MAX_ATTEMPTS: Final[int] = 5
+RETRY_BACKOFF_BASE_SECONDS: Final[float] = 0.5
+RETRY_BACKOFF_MAX_SECONDS: Final[float] = 32.0
+ADAPTIVE_INITIAL_CONCURRENCY: Final[int] = 20
+ADAPTIVE_MIN_CONCURRENCY: Final[int] = 1
+ADAPTIVE_LATENCY_TARGET_SECONDS: Final[float] = 1.0
+ADAPTIVE_DECREASE_COOLDOWN_SECONDS: Final[float] = 1.0
 
 # PATHS
 OUTPUT_PATH: Final[Path] = Path("output/")
 TEMP_PATH: Final[Path] = Path("temp/")
 AUTH_PATH: Final[Path] = Path("auth/")
+CACHE_PATH: Final[Path] = Path("cache/")
+
+# CACHE
+MESSAGE_CACHE_ENABLED: Final[bool] = True
+MESSAGE_CACHE_MAX_BYTES: Final[int] = 512 * 1024 * 1024
+INCREMENTAL_SYNC_ENABLED: Final[bool] = False
+INCREMENTAL_SYNC_MARGIN_SECONDS: Final[int] = 24 * 60 * 60
+STATEMENT_CACHE_ENABLED: Final[bool] = True
+
+# PARSING
+HTML_EXTRACTION_ENGINE: Final[str] = "html2text"
+SAVE_STATEMENT_TEMP_FILES: Final[bool] = False
+# Area of each statement page to extract text from, as (x0, top, x1, bottom) in PDF
+# points, or None for the whole page
+BoundingBox = Tuple[float, float, float, float]
+BANK_STATEMENT_CROP_BOX: Final[Optional[BoundingBox]] = None
+
+# OUTPUT
+PARQUET_BATCH_SIZE: Final[int] = 10_000
+EXTERNAL_SORT_MAX_IN_MEMORY: Final[int] = 100_000
+PARTITION_FILENAME: Final[str] = "part.jsonl"
+
+# S3
+S3_MULTIPART_THRESHOLD_BYTES: Final[int] = 16 * 1024 * 1024
+S3_MULTIPART_CHUNK_SIZE_BYTES: Final[int] = 16 * 1024 * 1024
+S3_MULTIPART_MAX_CONCURRENCY: Final[int] = 10
+S3_UPLOAD_MAX_WORKERS: Final[int] = 16
 
 # CONCURRENCY
 THREAD_POOL_MAX_WORKERS: Final[int] = 200
+ASYNC_GATEWAY_MAX_CONCURRENCY: Final[int] = 32
+STREAM_QUEUE_MAX_SIZE: Final[int] = 100
+PARSE_PROCESS_MAX_WORKERS: Final[int] = os.cpu_count() or 1
+PARSE_PROCESS_CHUNK_SIZE: Final[int] = 50
+PARSE_PROCESS_MIN_MESSAGES: Final[int] = 200
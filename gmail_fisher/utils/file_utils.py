@@ -1,4 +1,5 @@
 import base64
+import hashlib
 import os
 from pathlib import Path
 
@@ -6,9 +7,13 @@ from gmail_fisher import logger
 
 
 class FileUtils:
+    @classmethod
+    def decode_base64(cls, base64_string: str) -> bytes:
+        return base64.urlsafe_b64decode(base64_string.encode("UTF-8"))
+
     @classmethod
     def save_base64_pdf(cls, base64_string: str, file_path: Path, message_id: str):
-        file_data = base64.urlsafe_b64decode(base64_string.encode("UTF-8"))
+        file_data = cls.decode_base64(base64_string)
 
         if not os.path.isdir(file_path.parent):
             os.mkdir(file_path.parent)
@@ -18,3 +23,11 @@ class FileUtils:
         logger.success(
             f"Successfully saved attachment with {file_path=} and {message_id=}"
         )
+
+    @classmethod
+    def md5(cls, file_path: Path) -> str:
+        digest = hashlib.md5()
+        with open(file_path, "rb") as file:
+            for chunk in iter(lambda: file.read(1024 * 1024), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
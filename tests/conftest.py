@@ -455,3 +455,65 @@ def bolt_food_messages() -> Iterable[GmailMessage]:
             date="Tue, 27 Apr 2021 19:06:37 +0000 (UTC)",
         ),
     ]
+
+
+@pytest.fixture
+def bolt_ride_messages() -> Iterable[GmailMessage]:
+    return [
+        GmailMessage(
+            id=f"bolt-ride-{i}",
+            subject=f"{10 + i}.05.2021 Thanks for riding with Bolt, distance {3 + i} km, "
+            f"10:05 - Rua Augusta, Lisboa - 10:20 - Avenida da Liberdade, Lisboa - "
+            f"Total 7.{i}0€",
+            body=None,
+            date=f"Mon, {10 + i} May 2021 10:25:00 +0000 (UTC)",
+        )
+        for i in range(5)
+    ]
+
+
+@pytest.fixture
+def banco_ctt_statement_lines() -> Iterable[str]:
+    return [
+        "Extrato Integrado",
+        "Data Mov. Data Valor Descritivo Débito Crédito Saldo",
+        "02-03-2021 01-03-2021 COMPRA CONTINENTE LISBOA 00123 -12,50 1.034,20",
+        "03-03-2021 03-03-2021 TRF MB WAY 00124 25,00 1.059,20",
+        "Saldo 02-03-2021 01-03-2021 a b c",
+        "05-03-2021 04-03-2021 COMPRA CUF 00125 -40,00 1.019,20",
+    ]
+
+
+@pytest.fixture
+def bolt_ride_html_message() -> GmailMessage:
+    return GmailMessage(
+        id="1795a2f7c3b4e601",
+        subject="Your Bolt trip",
+        date="Mon, 10 May 2021 10:25:00 +0000 (UTC)",
+        body="""<html><head><title>Bolt</title></head><body>
+            <p>Thanks for riding with Bolt!</p>
+            <p>10 May 2021 10:25</p>
+            <p>Ride • 3 km • 15 min</p>
+            <table>
+                <tr><th>Pickup:</th></tr>
+                <tr><td>Rua Augusta 24, Lisboa</td><td>&nbsp;</td><td>Dropoff:</td></tr>
+                <tr><td>Avenida da Liberdade 110, Lisboa</td></tr>
+                <tr><td>&nbsp;</td></tr>
+            </table>
+            <table><tr><td>Total: 7.40€</td></tr></table>
+        </body></html>""",
+    )
+
+
+@pytest.fixture
+def uber_ride_html_message() -> GmailMessage:
+    return GmailMessage(
+        id="1795a2f7c3b4e602",
+        subject="Total €5.40 10 May 2021 Thanks for riding, Valter",
+        date="Mon, 10 May 2021 22:40:00 +0000 (UTC)",
+        body="""<html><head><title>Uber</title></head><body>
+            <p>Thanks for riding, Valter</p>
+            <table><tr><td>UberX</td><td>3.45 kilometres</td><td>12 min</td></tr></table>
+            <table><tr><td>Total</td><td>€5.40</td></tr></table>
+        </body></html>""",
+    )
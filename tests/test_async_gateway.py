@@ -0,0 +1,62 @@
+import asyncio
+
+from gmail_fisher.api.async_gateway import AsyncGmailGateway
+from gmail_fisher.api.gateway import (
+    GmailGateway,
+    MessageIdPage,
+    DEFAULT_FETCH_PROFILE,
+)
+from gmail_fisher.data.message_cache import MessageCache
+from gmail_fisher.data.models import GmailMessage
+from gmail_fisher.main import read_messages
+
+
+def test_get_email_messages_fetches_every_page(mocker, tmp_path):
+    cache = MessageCache(db_path=tmp_path / "messages.sqlite3")
+    cache.put_many(
+        [GmailMessage(id="id1", subject="cached", date="Wed, 28 Oct 2020")],
+        GmailGateway.message_cache_key(DEFAULT_FETCH_PROFILE, False),
+    )
+    mocker.patch.object(MessageCache, "get_instance", return_value=cache)
+    mocker.patch.object(
+        GmailGateway,
+        "iter_message_id_pages",
+        return_value=iter(
+            [
+                MessageIdPage(message_ids=["id1", "id2"], next_page_token="p2"),
+                MessageIdPage(message_ids=["id3", "broken"]),
+            ]
+        ),
+    )
+
+    def get_message_detail(message_id, fetch_body, profile):
+        if message_id == "broken":
+            raise RuntimeError("quota exceeded")
+        return GmailMessage(id=message_id, subject="fetched", date="Wed, 28 Oct 2020")
+
+    fetch = mocker.patch.object(
+        GmailGateway, "get_message_detail", side_effect=get_message_detail
+    )
+
+    messages = asyncio.run(
+        AsyncGmailGateway.get_email_messages("sender@bolt.eu", "receipt")
+    )
+
+    assert sorted(message.id for message in messages) == ["id1", "id2", "id3"]
+    assert sorted(call.args[0] for call in fetch.call_args_list) == [
+        "broken",
+        "id2",
+        "id3",
+    ]
+
+
+def test_read_messages_passes_max_results(mocker):
+    get_email_messages = mocker.patch.object(
+        AsyncGmailGateway, "get_email_messages", return_value=[]
+    )
+
+    assert asyncio.run(read_messages("sender@bolt.eu", "receipt", max_results=10)) == []
+
+    get_email_messages.assert_called_once_with(
+        "sender@bolt.eu", "receipt", max_results=10
+    )
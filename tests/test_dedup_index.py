@@ -0,0 +1,91 @@
+from gmail_fisher.data.dedup_index import DedupIndex
+from gmail_fisher.data.models import (
+    BoltFoodExpense,
+    BoltTransportationExpense,
+    UberEatsExpense,
+    UberTransportationExpense,
+)
+
+
+def uber_ride(id: str, total: float = 7.4) -> UberTransportationExpense:
+    return UberTransportationExpense(
+        id=id,
+        distance_km=5.0,
+        from_address="Rua A",
+        to_address="Rua B",
+        total=total,
+        date="2021-05-10",
+    )
+
+
+def test_drop_duplicates_within_a_run(tmp_path):
+    index = DedupIndex(db_path=tmp_path / "dedup_index.sqlite3")
+
+    expenses = list(
+        index.drop_duplicates([uber_ride("1"), uber_ride("2"), uber_ride("3", 9.1)])
+    )
+
+    assert [expense.id for expense in expenses] == ["1", "3"]
+
+
+def bolt_ride(id: str) -> BoltTransportationExpense:
+    return BoltTransportationExpense(
+        id=id,
+        distance_km=5,
+        from_address=" rua a",
+        to_address="RUA B",
+        total=7.40,
+        date="2021-05-10",
+    )
+
+
+def test_drop_duplicates_keeps_distinct_same_day_rides(tmp_path):
+    index = DedupIndex(db_path=tmp_path / "dedup_index.sqlite3")
+
+    expenses = list(
+        index.drop_duplicates([uber_ride("uber"), bolt_ride("1"), bolt_ride("2")])
+    )
+
+    assert [expense.id for expense in expenses] == ["uber", "1", "2"]
+    assert list(index.drop_duplicates([bolt_ride("1")])) == [bolt_ride("1")]
+
+
+def test_drop_duplicates_across_interleaved_runs(tmp_path):
+    index = DedupIndex(db_path=tmp_path / "dedup_index.sqlite3")
+    uber_run = index.drop_duplicates([uber_ride("uber"), uber_ride("uber-2", 9.1)])
+    bolt_run = index.drop_duplicates([uber_ride("bolt")])
+
+    assert next(uber_run).id == "uber"
+    assert list(bolt_run) == []
+    assert [expense.id for expense in uber_run] == ["uber-2"]
+
+
+def test_drop_duplicates_across_runs_keeps_the_first_expense(tmp_path):
+    db_path = tmp_path / "dedup_index.sqlite3"
+    list(DedupIndex(db_path=db_path).drop_duplicates([uber_ride("1")]))
+
+    expenses = list(
+        DedupIndex(db_path=db_path).drop_duplicates([uber_ride("2"), uber_ride("1")])
+    )
+
+    assert [expense.id for expense in expenses] == ["1"]
+
+
+def test_drop_duplicates_keeps_distinct_same_day_food_orders(tmp_path):
+    index = DedupIndex(db_path=tmp_path / "dedup_index.sqlite3")
+    lunch = UberEatsExpense(id="1", restaurant="Udon", total=9.5, date="2021-05-10")
+    dinner = UberEatsExpense(id="2", restaurant="Udon", total=9.5, date="2021-05-10")
+    bolt_food = BoltFoodExpense(
+        id="3", restaurant="udon ", total=9.50, date="2021-05-10"
+    )
+
+    expenses = list(index.drop_duplicates([lunch, dinner, bolt_food]))
+
+    assert [expense.id for expense in expenses] == ["1", "2", "3"]
+    assert list(index.drop_duplicates([lunch])) == [lunch]
+
+
+def test_fingerprint_is_per_expense_kind():
+    uber_eats = UberEatsExpense(id="1", restaurant="Udon", total=9.5, date="2021-05-10")
+
+    assert uber_eats.fingerprint != uber_ride("1").fingerprint
@@ -0,0 +1,49 @@
+import random
+from dataclasses import dataclass
+
+import pytest
+
+from gmail_fisher.data import external_sort
+from gmail_fisher.data.external_sort import sort_expenses_by_date
+
+
+@dataclass
+class Expense:
+    id: int
+    date: str
+
+
+def random_expenses(count: int):
+    rng = random.Random(7)
+    return [
+        Expense(id=i, date=f"2021-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}")
+        for i in range(count)
+    ]
+
+
+@pytest.mark.parametrize("max_in_memory", [1, 7, 100, 1000])
+def test_matches_stable_sorted(tmp_path, max_in_memory):
+    expenses = random_expenses(250)
+
+    result = list(
+        sort_expenses_by_date(expenses, max_in_memory=max_in_memory, spill_dir=tmp_path)
+    )
+
+    assert result == sorted(expenses, key=lambda exp: exp.date, reverse=True)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_ordered_input_is_concatenated_without_merging(mocker, tmp_path):
+    merge = mocker.spy(external_sort.heapq, "merge")
+    expenses = sorted(random_expenses(100), key=lambda exp: exp.date, reverse=True)
+
+    result = list(sort_expenses_by_date(expenses, max_in_memory=10, spill_dir=tmp_path))
+
+    assert result == expenses
+    merge.assert_not_called()
+
+
+def test_missing_dates_sort_last():
+    expenses = [Expense(1, None), Expense(2, "2021-01-01")]
+
+    assert [exp.id for exp in sort_expenses_by_date(expenses)] == [2, 1]
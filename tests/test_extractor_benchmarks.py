@@ -0,0 +1,94 @@
+"""
+Extraction throughput of each parser against the conftest fixtures, with pytest-benchmark
+from the dev dependencies. Save a baseline with 'pytest tests/test_extractor_benchmarks.py
+--benchmark-autosave' and compare later runs against it with '--benchmark-compare'.
+"""
+from dataclasses import replace
+
+import html2text
+import pytest
+
+from gmail_fisher.parsers.food import BoltFoodParser, UberEatsParser
+from gmail_fisher.data.text_nodes import extract_text_nodes
+from gmail_fisher.parsers.html_extractor import HtmlEngine
+from gmail_fisher.parsers.patterns import BANCO_CTT_TRANSACTION_LINE
+from gmail_fisher.parsers.transportation import BoltParser
+from gmail_fisher.data.models import GmailMessage
+
+pytest.importorskip("pytest_benchmark")
+
+
+def fresh_copies(messages):
+    # Parsers release the parsed body of each message, so every round gets new messages
+    return [replace(message) for message in messages]
+
+
+def test_benchmark_bolt_food_parser(benchmark, bolt_food_messages):
+    expenses = benchmark(
+        lambda: BoltFoodParser.parse_expenses_from_messages(
+            fresh_copies(bolt_food_messages)
+        )
+    )
+
+    assert len(expenses) == len(bolt_food_messages)
+
+
+def test_benchmark_uber_eats_parser(benchmark, uber_eats_messages):
+    expenses = benchmark(
+        lambda: UberEatsParser.parse_expenses_from_messages(
+            fresh_copies(uber_eats_messages)
+        )
+    )
+
+    assert len(expenses) == len(uber_eats_messages)
+
+
+def test_benchmark_bolt_transport_parser(benchmark, bolt_ride_messages):
+    expenses = benchmark(
+        lambda: BoltParser.parse_expenses_from_messages(
+            fresh_copies(bolt_ride_messages)
+        )
+    )
+
+    assert len(expenses) == len(bolt_ride_messages)
+    assert (expenses[0].date, expenses[0].distance_km, expenses[0].total_euros) == (
+        "2021-05-10",
+        3,
+        7.0,
+    )
+
+
+def test_benchmark_banco_ctt_transaction_lines(benchmark, banco_ctt_statement_lines):
+    # About the number of lines of a yearly statement
+    lines = banco_ctt_statement_lines * 100
+
+    matches = benchmark(
+        lambda: [
+            match
+            for match in map(BANCO_CTT_TRANSACTION_LINE.match, lines)
+            if match is not None
+        ]
+    )
+
+    assert len(matches) == 300
+
+
+@pytest.mark.parametrize("engine", [HtmlEngine.HTML2TEXT, HtmlEngine.TOKENIZER])
+def test_benchmark_bolt_food_html_total(
+    mocker, benchmark, bolt_email_html_body, engine
+):
+    mocker.patch.object(BoltFoodParser, "html_engine", engine)
+    message = GmailMessage(id="1", subject="", date="", body=bolt_email_html_body)
+
+    total = benchmark(lambda: BoltFoodParser.get_total_payed(replace(message)))
+
+    assert total == 9.03
+
+
+@pytest.mark.parametrize(
+    "extract", [html2text.html2text, extract_text_nodes], ids=["html2text", "tokenizer"]
+)
+def test_benchmark_html_text_extraction(benchmark, bolt_email_html_body, extract):
+    text = benchmark(lambda: extract(bolt_email_html_body))
+
+    assert "Hello Beijing" in str(text)
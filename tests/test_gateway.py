@@ -0,0 +1,386 @@
+import base64
+import threading
+import time
+from datetime import datetime
+
+import httplib2
+import pytest
+from googleapiclient.errors import HttpError
+
+from gmail_fisher.api.gateway import GmailClient, GmailGateway, MessageIdPage
+from gmail_fisher.data.message_cache import MessageCache
+from gmail_fisher.data.sync_state import SyncStateStore, SyncState
+from gmail_fisher.data.models import GmailMessage, FetchProfile, MessageFormat
+
+
+def test_auth_http_request_reuses_transport_per_thread(mocker):
+    mocker.patch.object(GmailClient, "get_credentials", return_value=mocker.Mock())
+    GmailClient.reset_transport_stats()
+    transports = []
+
+    def worker():
+        first = GmailClient.auth_http_request()
+        second = GmailClient.auth_http_request()
+        transports.append((first, second))
+
+    threads = [threading.Thread(target=worker) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert all(first is second for first, second in transports)
+    assert len({id(first) for first, _ in transports}) == 3
+    stats = GmailClient.get_transport_stats()
+    assert stats.connections_opened == 3
+    assert stats.connections_reused == 3
+
+
+class FakeBatch:
+    def __init__(self, callback, outcomes, batch_sizes):
+        self.callback = callback
+        self.outcomes = outcomes
+        self.batch_sizes = batch_sizes
+        self.request_ids = []
+
+    def add(self, request, request_id):
+        self.request_ids.append(request_id)
+
+    def execute(self, http=None):
+        self.batch_sizes.append(len(self.request_ids))
+        for request_id in self.request_ids:
+            outcome = self.outcomes[request_id].pop(0)
+            if isinstance(outcome, Exception):
+                self.callback(request_id, None, outcome)
+            else:
+                self.callback(request_id, outcome, None)
+
+
+def http_error(status: int) -> HttpError:
+    return HttpError(httplib2.Response({"status": status}), b"{}")
+
+
+@pytest.fixture
+def fake_batch_client(mocker):
+    mocker.patch.object(GmailClient, "auth_http_request")
+    mocker.patch("gmail_fisher.api.gateway.time.sleep")
+    outcomes, batch_sizes = {}, []
+    instance = mocker.Mock()
+    instance.new_batch_http_request.side_effect = lambda callback: FakeBatch(
+        callback, outcomes, batch_sizes
+    )
+    mocker.patch.object(GmailClient, "get_instance", return_value=instance)
+    return outcomes, batch_sizes
+
+
+def message_result(snippet: str) -> dict:
+    return {
+        "snippet": snippet,
+        "payload": {"headers": [{"name": "Date", "value": "Wed, 28 Oct 2020"}]},
+    }
+
+
+def test_get_message_details_batch_splits_and_retries(fake_batch_client):
+    outcomes, batch_sizes = fake_batch_client
+    outcomes.update({f"id{i}": [message_result(f"subject {i}")] for i in range(5)})
+    outcomes["id1"].insert(0, http_error(429))
+    outcomes["id3"] = [http_error(404)]
+
+    messages = GmailGateway.get_message_details_batch(
+        [f"id{i}" for i in range(5)], fetch_body=False, batch_size=2
+    )
+
+    assert sorted(message.id for message in messages) == ["id0", "id1", "id2", "id4"]
+    assert batch_sizes == [2, 2, 1, 1]
+    assert (
+        GmailMessage(
+            id="id1", subject="subject 1", date="Wed, 28 Oct 2020", attachments=[]
+        )
+        in messages
+    )
+
+
+def test_execute_batch_rejects_invalid_batch_size():
+    with pytest.raises(ValueError):
+        GmailGateway.execute_batch({}, batch_size=101)
+
+
+@pytest.fixture
+def fake_list_pages(mocker):
+    pages = {
+        None: {"messages": [{"id": "a"}, {"id": "b"}], "nextPageToken": "p2"},
+        "p2": {"messages": [{"id": "c"}, {"id": "d"}], "nextPageToken": "p3"},
+        "p3": {"messages": [{"id": "e"}]},
+    }
+    list_calls = []
+
+    def list_messages(userId, q, maxResults, pageToken):
+        list_calls.append((pageToken, maxResults))
+        request = mocker.Mock()
+        page = pages[pageToken]
+        request.execute.return_value = {
+            **page,
+            "messages": page["messages"][:maxResults],
+        }
+        return request
+
+    mocker.patch.object(GmailClient, "auth_http_request")
+    instance = mocker.Mock()
+    instance.users().messages().list.side_effect = list_messages
+    mocker.patch.object(GmailClient, "get_instance", return_value=instance)
+    return list_calls
+
+
+def test_list_message_ids_follows_page_tokens(fake_list_pages):
+    message_ids = GmailGateway.list_message_ids("sender@bolt.eu", "receipt")
+
+    assert message_ids == ["a", "b", "c", "d", "e"]
+    assert [page_token for page_token, _ in fake_list_pages] == [None, "p2", "p3"]
+
+
+def test_iter_message_id_pages_is_lazy_and_resumable(fake_list_pages):
+    pages = GmailGateway.iter_message_id_pages("sender@bolt.eu", "receipt")
+    first_page = next(pages)
+
+    assert first_page.message_ids == ["a", "b"]
+    assert len(fake_list_pages) == 1
+
+    resumed = GmailGateway.list_message_ids(
+        "sender@bolt.eu", "receipt", page_token=first_page.next_page_token
+    )
+    assert resumed == ["c", "d", "e"]
+
+
+def test_list_message_ids_stops_at_max_results(fake_list_pages):
+    message_ids = GmailGateway.list_message_ids(
+        "sender@bolt.eu", "receipt", max_results=3
+    )
+
+    assert message_ids == ["a", "b", "c"]
+    assert fake_list_pages[-1] == ("p2", 1)
+
+
+def test_fetch_profile_request_params():
+    profile = FetchProfile(
+        format=MessageFormat.METADATA,
+        metadata_headers=("Date",),
+        fields="id,snippet,payload/headers",
+    )
+
+    assert profile.request_params() == {
+        "format": "metadata",
+        "metadataHeaders": ["Date"],
+        "fields": "id,snippet,payload/headers",
+    }
+    assert not profile.includes_body
+
+
+def test_map_message_minimal_format_uses_internal_date():
+    message = GmailGateway.map_message(
+        "id1",
+        {"id": "id1", "snippet": "Total €16.95", "internalDate": "1603913876000"},
+        fetch_body=False,
+    )
+
+    assert message.date == "Wed, 28 Oct 2020 19:37:56 +0000"
+    assert message.get_date_as_datetime() == datetime(2020, 10, 28)
+
+
+def test_map_message_raw_format():
+    raw = (
+        b"Date: Thu, 10 Jun 2021 19:05:57 +0000\r\n"
+        b"Subject: Delivery from Bolt Food\r\n"
+        b"Content-Type: text/html; charset=utf-8\r\n\r\n"
+        b"<html>\n<b>Total charged:</b> 9.73\xe2\x82\xac\n</html>\n"
+    )
+    message = GmailGateway.map_message(
+        "id1",
+        {"snippet": "Bon Appetit", "raw": base64.urlsafe_b64encode(raw).decode()},
+        fetch_body=True,
+    )
+
+    assert message.date == "Thu, 10 Jun 2021 19:05:57 +0000"
+    assert message.body == "<html><b>Total charged:</b> 9.73€</html>"
+
+
+def test_get_email_messages_only_fetches_uncached_messages(mocker, tmp_path):
+    cache = MessageCache(db_path=tmp_path / "messages.sqlite3")
+    mocker.patch.object(MessageCache, "get_instance", return_value=cache)
+    mocker.patch.object(
+        GmailGateway,
+        "iter_message_id_pages",
+        side_effect=lambda *args: iter([MessageIdPage(message_ids=["id1", "id2"])]),
+    )
+    get_message_detail = mocker.patch.object(
+        GmailGateway,
+        "get_message_detail",
+        side_effect=lambda message_id, *args: GmailMessage(
+            id=message_id, subject="subject", date="Wed, 28 Oct 2020"
+        ),
+    )
+
+    first = GmailGateway.get_email_messages("sender@bolt.eu", "receipt")
+    second = GmailGateway.get_email_messages("sender@bolt.eu", "receipt")
+
+    assert get_message_detail.call_count == 2
+    assert sorted(message.id for message in second) == ["id1", "id2"]
+    assert sorted(first, key=lambda m: m.id) == sorted(second, key=lambda m: m.id)
+
+
+@pytest.fixture
+def sync_store(mocker, tmp_path):
+    store = SyncStateStore(db_path=tmp_path / "sync_state.sqlite3")
+    mocker.patch.object(SyncStateStore, "get_instance", return_value=store)
+    mocker.patch.object(GmailGateway, "get_current_history_id", return_value="200")
+    return store
+
+
+def test_list_message_ids_incremental_lists_only_added_messages(mocker, sync_store):
+    sync_store.put(
+        "from:sender@bolt.eu receipt",
+        SyncState(history_id="100", message_ids=["old1", "old2"], synced_at=86400 * 10),
+    )
+    mocker.patch.object(
+        GmailGateway, "list_added_message_ids", return_value={"new1", "unrelated"}
+    )
+    list_message_ids = mocker.patch.object(
+        GmailGateway, "list_message_ids", return_value=["new1", "old2"]
+    )
+
+    message_ids = GmailGateway.list_message_ids_incremental("sender@bolt.eu", "receipt")
+
+    assert message_ids == ["new1", "old1", "old2"]
+    list_message_ids.assert_called_once_with(
+        "sender@bolt.eu", f"receipt after:{86400 * 9}"
+    )
+    assert sync_store.get("from:sender@bolt.eu receipt").history_id == "200"
+
+
+def test_list_message_ids_incremental_falls_back_when_history_expired(
+    mocker, sync_store
+):
+    sync_store.put(
+        "from:sender@bolt.eu receipt",
+        SyncState(history_id="1", message_ids=["old1"], synced_at=0),
+    )
+    mocker.patch.object(
+        GmailGateway, "list_added_message_ids", side_effect=http_error(404)
+    )
+    mocker.patch.object(GmailGateway, "list_message_ids", return_value=["old1", "new1"])
+
+    message_ids = GmailGateway.list_message_ids_incremental("sender@bolt.eu", "receipt")
+
+    assert message_ids == ["old1", "new1"]
+
+
+def test_iter_email_messages_streams_with_bounded_queue(mocker):
+    mocker.patch.object(
+        GmailGateway,
+        "iter_message_id_pages",
+        side_effect=lambda *args: iter(
+            [MessageIdPage(message_ids=[f"id{i}" for i in range(10)])]
+        ),
+    )
+    mocker.patch.object(
+        GmailGateway,
+        "get_message_detail",
+        side_effect=lambda message_id, *args: GmailMessage(
+            id=message_id, subject="subject", date="Wed, 28 Oct 2020"
+        ),
+    )
+
+    messages = GmailGateway.iter_email_messages(
+        "sender@bolt.eu", "receipt", use_cache=False, queue_size=2
+    )
+    first_message = next(messages)
+    remaining = list(messages)
+
+    assert sorted(m.id for m in [first_message, *remaining]) == sorted(
+        f"id{i}" for i in range(10)
+    )
+
+
+def test_iter_email_messages_stops_fetching_when_consumer_stops(mocker):
+    mocker.patch.object(
+        GmailGateway,
+        "iter_message_id_pages",
+        side_effect=lambda *args: iter(
+            [MessageIdPage(message_ids=[f"id{i}" for i in range(500)])]
+        ),
+    )
+    fetch = mocker.patch.object(
+        GmailGateway,
+        "get_message_detail",
+        side_effect=lambda message_id, *args: GmailMessage(
+            id=message_id, subject="subject", date="Wed, 28 Oct 2020"
+        ),
+    )
+
+    messages = GmailGateway.iter_email_messages(
+        "sender@bolt.eu", "receipt", use_cache=False, queue_size=1
+    )
+    next(messages)
+    messages.close()
+    time.sleep(0.3)
+
+    assert fetch.call_count < 500
+
+
+def test_iter_email_messages_raises_listing_errors_after_fetched_messages(mocker):
+    def iter_message_id_pages(*args):
+        yield MessageIdPage(message_ids=["id1", "id2"])
+        raise http_error(500)
+
+    mocker.patch.object(
+        GmailGateway, "iter_message_id_pages", side_effect=iter_message_id_pages
+    )
+    mocker.patch.object(
+        GmailGateway,
+        "get_message_detail",
+        side_effect=lambda message_id, *args: GmailMessage(
+            id=message_id, subject="subject", date="Wed, 28 Oct 2020"
+        ),
+    )
+
+    messages = GmailGateway.iter_email_messages(
+        "sender@bolt.eu", "receipt", use_cache=False
+    )
+    received = []
+    with pytest.raises(HttpError):
+        for message in messages:
+            received.append(message.id)
+
+    assert sorted(received) == ["id1", "id2"]
+
+
+def test_iter_email_messages_fetches_each_page_in_batches(mocker):
+    mocker.patch.object(
+        GmailGateway,
+        "iter_message_id_pages",
+        side_effect=lambda *args: iter(
+            [
+                MessageIdPage(message_ids=["id1", "id2"], next_page_token="page2"),
+                MessageIdPage(message_ids=["id3"]),
+            ]
+        ),
+    )
+    get_message_details_batch = mocker.patch.object(
+        GmailGateway,
+        "get_message_details_batch",
+        side_effect=lambda message_ids, *args: [
+            GmailMessage(id=message_id, subject="subject", date="Wed, 28 Oct 2020")
+            for message_id in message_ids
+        ],
+    )
+    get_message_detail = mocker.patch.object(GmailGateway, "get_message_detail")
+
+    messages = GmailGateway.iter_email_messages(
+        "sender@bolt.eu", "receipt", use_cache=False, batch_size=50
+    )
+
+    assert sorted(message.id for message in messages) == ["id1", "id2", "id3"]
+    assert sorted(
+        call.args[0] for call in get_message_details_batch.call_args_list
+    ) == [["id1", "id2"], ["id3"]]
+    assert get_message_details_batch.call_args.args[2] == 50
+    get_message_detail.assert_not_called()
@@ -0,0 +1,34 @@
+import pytest
+
+from gmail_fisher.data.models import GmailMessage
+from gmail_fisher.parsers.food import BoltFoodParser
+from gmail_fisher.data.text_nodes import TextNodes, extract_text_nodes
+from gmail_fisher.parsers.html_extractor import HtmlEngine
+
+
+@pytest.fixture
+def bolt_food_html_message(bolt_email_html_body) -> GmailMessage:
+    return GmailMessage(
+        id="17cfe2b5b6a2b2c4",
+        subject="07-11-2021 Bon Appetit, Valter! This is your receipt. From Hello Beijing",
+        date="Sun, 07 Nov 2021 20:03:11 +0000 (UTC)",
+        body=bolt_email_html_body,
+    )
+
+
+def test_extract_text_nodes_skips_head_and_styles(bolt_email_html_body):
+    nodes = TextNodes(extract_text_nodes(bolt_email_html_body))
+
+    assert nodes.nodes[1:4] == ["Bon Appetit,", "Valter!", "This is your receipt."]
+    assert nodes.after("From") == "Hello Beijing"
+    assert nodes.after("Total charged:") == "9.03€"
+    assert not any("text-decoration" in node for node in nodes.nodes)
+
+
+@pytest.mark.parametrize("engine", [HtmlEngine.HTML2TEXT, HtmlEngine.TOKENIZER])
+def test_bolt_food_total_payed_is_engine_independent(
+    mocker, bolt_food_html_message, engine
+):
+    mocker.patch.object(BoltFoodParser, "html_engine", engine)
+
+    assert BoltFoodParser.get_total_payed(bolt_food_html_message) == 9.03
@@ -0,0 +1,42 @@
+from gmail_fisher.data.message_cache import MessageCache
+from gmail_fisher.data.models import GmailMessage, MessageAttachment
+
+
+def gmail_message(message_id: str, body: str = "body") -> GmailMessage:
+    return GmailMessage(
+        id=message_id,
+        subject="Total €16.95 28 October 2020",
+        date="Wed, 28 Oct 2020 19:37:56 +0000 (UTC)",
+        attachments=[MessageAttachment(part_id="1", filename="a.pdf", id="att")],
+        body=body,
+    )
+
+
+def test_message_cache_round_trip_and_stats(tmp_path):
+    cache = MessageCache(db_path=tmp_path / "messages.sqlite3")
+    cache.put_many([gmail_message("id1"), gmail_message("id2")], "full")
+
+    cached = cache.get_many(["id1", "id2", "id3"], "full")
+    other_profile = cache.get_many(["id1"], "metadata")
+
+    assert cached == {"id1": gmail_message("id1"), "id2": gmail_message("id2")}
+    assert other_profile == {}
+    stats = cache.get_stats()
+    assert (stats.hits, stats.misses) == (2, 2)
+
+
+def test_message_cache_evicts_least_recently_read(tmp_path, mocker):
+    clock = mocker.patch("gmail_fisher.data.message_cache.time.time")
+    clock.return_value = 1
+    cache = MessageCache(db_path=tmp_path / "messages.sqlite3", max_bytes=10_000)
+    cache.put_many([gmail_message("old", "x" * 3000)], "full")
+    clock.return_value = 2
+    cache.put_many([gmail_message("recent", "x" * 3000)], "full")
+    clock.return_value = 3
+    cache.get_many(["old"], "full")
+
+    clock.return_value = 4
+    cache.put_many([gmail_message("new", "x" * 5000)], "full")
+
+    assert set(cache.get_many(["old", "recent", "new"], "full")) == {"old", "new"}
+    assert cache.get_stats().evictions == 1
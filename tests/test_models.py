@@ -0,0 +1,21 @@
+import html2text
+
+from gmail_fisher.data.models import GmailMessage
+
+
+def test_body_text_is_converted_once_and_released(mocker, bolt_email_html_body):
+    html2text_spy = mocker.spy(html2text, "html2text")
+    message = GmailMessage(
+        id="17cfe2b5b6a2b2c4",
+        subject="07-11-2021 Bon Appetit, Valter! This is your receipt.",
+        date="Sun, 07 Nov 2021 20:03:11 +0000 (UTC)",
+        body=bolt_email_html_body,
+    )
+
+    assert "**Total charged:**" in message.body_text
+    assert "**Total charged:** |  **9.03€**  " in message.body_lines
+    assert html2text_spy.call_count == 1
+
+    message.release_parsed_body()
+    message.body_text
+    assert html2text_spy.call_count == 2
@@ -0,0 +1,179 @@
+import base64
+
+import pytest
+from gmail_fisher.api.gateway import GmailGateway
+from gmail_fisher.data.models import BankExpense, GmailMessage, MessageAttachment
+from gmail_fisher.data.statement_cache import StatementCache
+from gmail_fisher.parsers.bank import BancoCttParser
+
+
+@pytest.fixture
+def statement_cache(mocker, tmp_path):
+    cache = StatementCache(db_path=tmp_path / "statements.sqlite3")
+    mocker.patch.object(StatementCache, "get_instance", return_value=cache)
+    return cache
+
+
+def statement_message(id: str) -> GmailMessage:
+    return GmailMessage(
+        id=id,
+        subject="Extrato",
+        date="Wed, 28 Oct 2020",
+        attachments=[
+            MessageAttachment(part_id="1", filename="extrato.pdf", id=f"a{id}")
+        ],
+    )
+
+
+def parse_fake_statement(pdf_statement: bytes):
+    content = pdf_statement.decode()
+    return [
+        BankExpense(
+            id=f"{content.split(' a')[1]}-tx",
+            description=content,
+            total_euros="-1,00",
+            date="2021-01-01",
+        )
+    ]
+
+
+def test_parse_statements_keeps_message_order(mocker, statement_cache):
+    mocker.patch.object(
+        GmailGateway,
+        "get_message_attachment",
+        side_effect=lambda message_id, attachment_id: base64.urlsafe_b64encode(
+            f"statement {attachment_id}".encode()
+        ).decode(),
+    )
+    mocker.patch.object(
+        BancoCttParser, "parse_expenses_from_messages", side_effect=parse_fake_statement
+    )
+    messages = [statement_message(str(id)) for id in range(5)]
+    messages.append(GmailMessage(id="none", subject="Extrato", date="", attachments=[]))
+
+    statement_expenses = BancoCttParser.parse_statements(messages, workers=1)
+
+    assert [expenses[0].id for expenses in statement_expenses] == [
+        f"{id}-tx" for id in range(5)
+    ]
+    assert [expenses[0].description for expenses in statement_expenses] == [
+        f"statement a{id}" for id in range(5)
+    ]
+
+
+def test_parse_statements_skips_failed_downloads(mocker, statement_cache):
+    def get_message_attachment(message_id, attachment_id):
+        if message_id == "1":
+            raise RuntimeError("boom")
+        return base64.urlsafe_b64encode(f"statement a{message_id}".encode()).decode()
+
+    mocker.patch.object(
+        GmailGateway, "get_message_attachment", side_effect=get_message_attachment
+    )
+    mocker.patch.object(
+        BancoCttParser, "parse_expenses_from_messages", side_effect=parse_fake_statement
+    )
+
+    statement_expenses = BancoCttParser.parse_statements(
+        [statement_message("0"), statement_message("1")], workers=1
+    )
+
+    assert [len(expenses) for expenses in statement_expenses] == [1, 0]
+
+
+def test_parse_statements_only_parses_new_statements(mocker, statement_cache):
+    get_message_attachment = mocker.patch.object(
+        GmailGateway,
+        "get_message_attachment",
+        side_effect=lambda message_id, attachment_id: base64.urlsafe_b64encode(
+            f"statement a{message_id if message_id != '2' else '0'}".encode()
+        ).decode(),
+    )
+    parse = mocker.patch.object(
+        BancoCttParser, "parse_expenses_from_messages", side_effect=parse_fake_statement
+    )
+    BancoCttParser.parse_statements([statement_message("0")], workers=1)
+
+    # '1' is new, '2' is a new message with the same PDF as '0'
+    statement_expenses = BancoCttParser.parse_statements(
+        [statement_message(id) for id in ("0", "1", "2")], workers=1
+    )
+
+    assert [expenses[0].id for expenses in statement_expenses] == [
+        "0-tx",
+        "1-tx",
+        "0-tx",
+    ]
+    assert [expenses[0].__dict__ for expenses in statement_expenses][0] == (
+        parse_fake_statement(b"statement a0")[0].__dict__
+    )
+    assert parse.call_count == 2
+    assert get_message_attachment.call_count == 3
+
+
+def test_fetch_expenses_keeps_lines_sharing_an_id(mocker):
+    mocker.patch.object(GmailGateway, "get_email_messages", return_value=[])
+    statement_expenses = [
+        parse_fake_statement(b"statement a0"),
+        parse_fake_statement(b"statement a0") + parse_fake_statement(b"statement a0"),
+    ]
+    mocker.patch.object(
+        BancoCttParser, "parse_statements", return_value=statement_expenses
+    )
+
+    expenses = BancoCttParser.fetch_expenses()
+
+    assert [expense.id for expense in expenses] == ["0-tx", "0-tx", "0-tx"]
+
+
+def pdf_with_lines(lines) -> bytes:
+    text = "BT /F1 10 Tf 20 TL 50 750 Td " + " ".join(f"({line}) '" for line in lines)
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+        "/Resources << /Font << /F1 5 0 R >> >> /Contents 4 0 R >>",
+        f"<< /Length {len(text) + 3} >>\nstream\n{text} ET\nendstream",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    pdf, offsets = "%PDF-1.4\n", []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += f"{number} 0 obj\n{body}\nendobj\n"
+    xref = len(pdf)
+    pdf += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n"
+    pdf += "".join(f"{offset:010d} 00000 n \n" for offset in offsets)
+    pdf += (
+        f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF"
+    )
+    return pdf.encode()
+
+
+def test_parse_expenses_from_statement_bytes():
+    statement = pdf_with_lines(
+        ["Extrato", "02-03-2021 01-03-2021 COMPRA CUF 00123 -12,50 1.034,20"]
+    )
+
+    expenses = BancoCttParser.parse_expenses_from_messages(statement)
+
+    assert expenses == [
+        BankExpense(
+            id="00123",
+            description="COMPRA CUF",
+            total_euros="-12,50",
+            date="2021-03-01",
+        )
+    ]
+    assert expenses[0].statement_line == f"{StatementCache.content_hash(statement)}:0"
+
+
+def test_iter_transaction_lines_only_reads_crop_box():
+    statement = pdf_with_lines(
+        ["Extrato", "02-03-2021 01-03-2021 COMPRA CUF 00123 -12,50 1.034,20"]
+    )
+
+    header_lines = BancoCttParser.iter_transaction_lines(statement, (0, 0, 612, 45))
+    table_lines = BancoCttParser.iter_transaction_lines(statement, (0, 50, 612, 792))
+
+    assert list(header_lines) == []
+    assert [match.group("id") for match in table_lines] == ["00123"]
@@ -0,0 +1,63 @@
+from dataclasses import replace
+
+import pytest
+
+from gmail_fisher.parsers.html_extractor import HtmlEngine
+from gmail_fisher.parsers.transportation import BoltParser, UberParser
+
+ENGINES = [HtmlEngine.HTML2TEXT, HtmlEngine.TOKENIZER]
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_bolt_parser_reads_receipt_body(mocker, bolt_ride_html_message, engine):
+    mocker.patch.object(BoltParser, "html_engine", engine)
+
+    expenses = BoltParser.parse_expenses_from_messages([bolt_ride_html_message])
+
+    assert [expense.__dict__ for expense in expenses] == [
+        {
+            "id": "1795a2f7c3b4e601",
+            "service": "Bolt",
+            "distance_km": 3,
+            "from_address": "Rua Augusta 24, Lisboa",
+            "to_address": "Avenida da Liberdade 110, Lisboa",
+            "total_euros": 7.4,
+            "date": "2021-05-10",
+        }
+    ]
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_uber_parser_reads_receipt_body(mocker, uber_ride_html_message, engine):
+    mocker.patch.object(UberParser, "html_engine", engine)
+
+    expenses = UberParser.parse_expenses_from_messages([uber_ride_html_message])
+
+    assert [expense.__dict__ for expense in expenses] == [
+        {
+            "id": "1795a2f7c3b4e602",
+            "service": "Uber",
+            "distance_km": 3.45,
+            "from_address": "",
+            "to_address": "",
+            "total_euros": 5.4,
+            "date": "2021-05-10",
+        }
+    ]
+
+
+@pytest.mark.parametrize(
+    "parser, fixture",
+    [(BoltParser, "bolt_ride_html_message"), (UberParser, "uber_ride_html_message")],
+)
+def test_transport_parsers_match_across_engines(mocker, request, parser, fixture):
+    message = request.getfixturevalue(fixture)
+    expenses = {}
+    for engine in ENGINES:
+        mocker.patch.object(parser, "html_engine", engine)
+        expenses[engine] = [
+            expense.__dict__
+            for expense in parser.parse_expenses_from_messages([replace(message)])
+        ]
+
+    assert expenses[HtmlEngine.HTML2TEXT] == expenses[HtmlEngine.TOKENIZER]
@@ -0,0 +1,51 @@
+import json
+
+from gmail_fisher.data.models import BankExpense, BoltFoodExpense, UberEatsExpense
+from gmail_fisher.data.partitions import (
+    DEFAULT_PARTITION,
+    export_partitioned_expenses,
+    get_partition,
+)
+
+
+def read_ids(path):
+    return [json.loads(line)["id"] for line in path.read_text().splitlines()]
+
+
+def test_get_partition():
+    bank_expense = BankExpense(
+        id="1", description="CUF", total_euros="-1,00", date="2021-03-01"
+    )
+    undated_expense = UberEatsExpense(id="2", restaurant="Udon", total=1.0, date=None)
+
+    assert get_partition(bank_expense, "Banco CTT") == ("banco-ctt", "2021", "03")
+    assert get_partition(undated_expense, "Food") == (
+        "uber-eats",
+        DEFAULT_PARTITION,
+        DEFAULT_PARTITION,
+    )
+
+
+def test_export_partitioned_expenses_only_reports_changed_partitions(tmp_path):
+    output_dir = tmp_path / "food"
+    expenses = [
+        UberEatsExpense(id="1", restaurant="Udon", total=9.5, date="2021-04-27"),
+        UberEatsExpense(id="2", restaurant="Udon", total=9.5, date="2021-04-02"),
+        BoltFoodExpense(id="3", restaurant="Chickinho", total=9.73, date="2021-06-10"),
+    ]
+    april = output_dir / "service=uber-eats" / "year=2021" / "month=04" / "part.jsonl"
+    june = output_dir / "service=bolt-food" / "year=2021" / "month=06" / "part.jsonl"
+
+    assert export_partitioned_expenses(expenses, output_dir, "Food") == [june, april]
+    assert read_ids(april) == ["1", "2"]
+
+    new_expense = BoltFoodExpense(
+        id="4", restaurant="Udon", total=5.0, date="2021-06-11"
+    )
+    changed_paths = export_partitioned_expenses(
+        expenses + [new_expense], output_dir, "Food", merge=True
+    )
+
+    assert changed_paths == [june]
+    assert read_ids(june) == ["4", "3"]
+    assert export_partitioned_expenses(expenses, output_dir, "Food") == [june]
@@ -0,0 +1,40 @@
+import pytest
+
+from gmail_fisher.parsers.patterns import (
+    BANCO_CTT_TRANSACTION_LINE,
+    BOLT_DISTANCE_KM,
+    BOLT_FOOD_RESTAURANT_COMMA,
+    BOLT_TOTAL,
+)
+
+
+def test_bank_transaction_line_groups():
+    match = BANCO_CTT_TRANSACTION_LINE.match(
+        "02-03-2021 01-03-2021 COMPRA CONTINENTE LISBOA 00123 -12,50 1.034,20"
+    )
+
+    assert match.group("date") == "01-03-2021"
+    assert match.group("description") == "COMPRA CONTINENTE LISBOA"
+    assert match.group("id") == "00123"
+    assert match.group("total") == "-12,50"
+
+
+def test_bank_transaction_line_is_anchored():
+    assert BANCO_CTT_TRANSACTION_LINE.match("Saldo 02-03-2021 01-03-2021 a b c") is None
+
+
+@pytest.mark.parametrize(
+    "pattern, subject, group, expected",
+    [
+        (BOLT_DISTANCE_KM, "Your trip, distance 12 km", "distance_km", "12"),
+        (BOLT_TOTAL, "Ride on 10.05.2021, Total 7.40€ paid", "total", "7.40"),
+        (
+            BOLT_FOOD_RESTAURANT_COMMA,
+            "10-06-2021 From Chickinho Rua X, 1070-292 Lisboa, Lisbon",
+            "restaurant",
+            "Chickinho Rua X",
+        ),
+    ],
+)
+def test_subject_extractors(pattern, subject, group, expected):
+    assert pattern.search(subject).group(group) == expected
@@ -0,0 +1,30 @@
+import json
+import os
+
+from gmail_fisher.parsers.restaurant_filters import RestaurantFilters
+
+
+def write_filters(path, trim, replace, mtime):
+    path.write_text(json.dumps({"trim": trim, "replace": replace}))
+    os.utime(path, (mtime, mtime))
+
+
+def test_apply_prefers_longest_filter():
+    filters = RestaurantFilters({"®": "", "® (Saldanha)": "", "&amp;": "&"})
+
+    assert filters.apply("Ben &amp; Jerry® (Saldanha)") == "Ben & Jerry"
+
+
+def test_get_instance_reloads_only_when_file_changes(tmp_path, mocker):
+    path = tmp_path / "restaurant-filters.json"
+    write_filters(path, [" (Rossio)"], {}, mtime=1000)
+    load = mocker.spy(RestaurantFilters, "load")
+
+    assert RestaurantFilters.get_instance(path).apply("Udon (Rossio)") == "Udon"
+    assert RestaurantFilters.get_instance(path).apply("Udon (Rossio)") == "Udon"
+    assert load.call_count == 1
+
+    write_filters(path, [], {" (Rossio)": " Rossio"}, mtime=2000)
+
+    assert RestaurantFilters.get_instance(path).apply("Udon (Rossio)") == "Udon Rossio"
+    assert load.call_count == 2
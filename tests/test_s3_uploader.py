@@ -0,0 +1,115 @@
+import hashlib
+import threading
+
+import pytest
+from boto3.exceptions import S3UploadFailedError
+from botocore.exceptions import ClientError
+
+from gmail_fisher.data.s3_uploader import S3BucketUploader, UploadStatus, file_etag
+
+
+class FakeS3Client:
+    """
+    In-memory stand-in for the S3 client calls made by S3BucketUploader.
+    """
+
+    def __init__(self, fail_keys=()):
+        self.objects = {}
+        self.uploads = []
+        self.fail_keys = set(fail_keys)
+        self.lock = threading.Lock()
+
+    def head_object(self, Bucket, Key):
+        if Key not in self.objects:
+            raise ClientError({"Error": {"Code": "404"}}, "HeadObject")
+        return self.objects[Key]
+
+    def upload_file(self, Filename, Bucket, Key, ExtraArgs=None, Config=None):
+        if Key in self.fail_keys:
+            raise S3UploadFailedError(f"Failed to upload {Filename} to {Bucket}/{Key}")
+        with open(Filename, "rb") as file:
+            etag = hashlib.md5(file.read()).hexdigest()
+        with self.lock:
+            self.uploads.append(Key)
+            self.objects[Key] = {"ETag": f'"{etag}"', **(ExtraArgs or {})}
+
+
+@pytest.fixture
+def files(tmp_path):
+    files = {}
+    for month in ("01", "02", "03"):
+        path = tmp_path / "food" / f"month={month}" / "part.jsonl"
+        path.parent.mkdir(parents=True)
+        path.write_text(f'{{"id": "{month}"}}\n')
+        files[path] = f"food/month={month}/part.jsonl"
+    return files
+
+
+def test_upload_skips_unchanged_objects(files):
+    client = FakeS3Client()
+    uploader = S3BucketUploader(client=client, bucket_name="bucket")
+    filepath, key = next(iter(files.items()))
+
+    assert uploader.upload(filepath, key) == UploadStatus.UPLOADED
+    assert uploader.upload(filepath, key) == UploadStatus.SKIPPED
+
+    filepath.write_text('{"id": "changed"}\n')
+    assert uploader.upload(filepath, key) == UploadStatus.UPLOADED
+    assert client.uploads == [key, key]
+
+
+def test_upload_skips_objects_with_matching_etag(files):
+    client = FakeS3Client()
+    filepath, key = next(iter(files.items()))
+    with open(filepath, "rb") as file:
+        client.objects[key] = {"ETag": f'"{hashlib.md5(file.read()).hexdigest()}"'}
+
+    status = S3BucketUploader(client=client, bucket_name="bucket").upload(filepath, key)
+
+    assert status == UploadStatus.SKIPPED
+
+
+def test_upload_reports_failures(tmp_path, files):
+    client = FakeS3Client(fail_keys={"food/month=02/part.jsonl"})
+    uploader = S3BucketUploader(client=client, bucket_name="bucket")
+    files[tmp_path / "missing.jsonl"] = "missing.jsonl"
+
+    report = uploader.upload_many(files)
+
+    assert sorted(report.uploaded) == [
+        "food/month=01/part.jsonl",
+        "food/month=03/part.jsonl",
+    ]
+    assert sorted(report.failed) == ["food/month=02/part.jsonl", "missing.jsonl"]
+    assert not report.succeeded
+
+
+def test_upload_reports_unreadable_files(mocker, files):
+    mocker.patch(
+        "gmail_fisher.data.s3_uploader.FileUtils.md5",
+        side_effect=PermissionError("Permission denied"),
+    )
+    uploader = S3BucketUploader(client=FakeS3Client(), bucket_name="bucket")
+
+    report = uploader.upload_many(files)
+
+    assert sorted(report.failed) == sorted(files.values())
+
+
+def test_upload_partitions_keys(tmp_path, files):
+    client = FakeS3Client()
+    uploader = S3BucketUploader(client=client, bucket_name="bucket")
+
+    report = uploader.upload_partitions(tmp_path / "food", list(files))
+
+    assert sorted(report.uploaded) == sorted(files.values())
+
+
+def test_file_etag_of_multipart_upload(tmp_path):
+    path = tmp_path / "large.jsonl"
+    path.write_bytes(b"a" * 10 + b"b" * 5)
+    parts = hashlib.md5(b"a" * 10).digest() + hashlib.md5(b"b" * 5).digest()
+
+    assert file_etag(path, multipart_threshold=10, chunk_size=10) == (
+        f"{hashlib.md5(parts).hexdigest()}-2"
+    )
@@ -0,0 +1,105 @@
+import socket
+import time
+
+import httplib2
+import pytest
+from googleapiclient.errors import HttpError
+
+from gmail_fisher.api.scheduler import AdaptiveScheduler, is_transient_error
+
+
+def http_error(status: int, content: bytes = b"{}") -> HttpError:
+    return HttpError(httplib2.Response({"status": status}), content)
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(mocker):
+    return mocker.patch("gmail_fisher.api.scheduler.time.sleep")
+
+
+@pytest.mark.parametrize(
+    "exception, expected",
+    [
+        (http_error(429), True),
+        (http_error(503), True),
+        (http_error(403, b'{"reason": "userRateLimitExceeded"}'), True),
+        (http_error(403, b'{"reason": "forbidden"}'), False),
+        (http_error(404), False),
+        (ConnectionResetError(), True),
+        (socket.timeout(), True),
+        (httplib2.ServerNotFoundError(), True),
+        (KeyError("payload"), False),
+        (TypeError("unsupported operand"), False),
+        (AttributeError("payload"), False),
+    ],
+)
+def test_is_transient_error(exception, expected):
+    assert is_transient_error(exception) == expected
+
+
+def test_execute_retries_transient_errors_and_halves_concurrency(mocker, no_sleep):
+    scheduler = AdaptiveScheduler(initial_concurrency=16)
+    request = mocker.Mock(side_effect=[http_error(429), http_error(500), "result"])
+
+    assert scheduler.execute("messages.get", request) == "result"
+
+    stats = scheduler.get_stats()
+    assert request.call_count == 3
+    assert no_sleep.call_count == 2
+    assert (stats.retries, stats.throttled, stats.failures) == (2, 1, 0)
+    assert stats.quota_units == 15
+    assert 8 <= stats.concurrency_limit < 9
+
+
+def test_execute_raises_after_last_attempt(mocker):
+    scheduler = AdaptiveScheduler(max_attempts=2)
+    request = mocker.Mock(side_effect=http_error(503))
+
+    with pytest.raises(HttpError):
+        scheduler.execute("messages.get", request)
+
+    assert request.call_count == 2
+    assert scheduler.get_stats().failures == 1
+
+
+def test_execute_does_not_retry_permanent_errors(mocker):
+    scheduler = AdaptiveScheduler()
+    request = mocker.Mock(side_effect=http_error(404))
+
+    with pytest.raises(HttpError):
+        scheduler.execute("messages.get", request)
+
+    assert request.call_count == 1
+
+
+def test_fast_responses_increase_concurrency_additively(mocker):
+    scheduler = AdaptiveScheduler(initial_concurrency=4, max_concurrency=5)
+
+    for _ in range(4):
+        scheduler.execute("messages.get", mocker.Mock(return_value="result"))
+
+    assert scheduler.get_stats().concurrency_limit == pytest.approx(5, abs=0.1)
+
+
+def test_execute_charges_batches_larger_than_the_quota_bucket(mocker):
+    scheduler = AdaptiveScheduler(quota_units_per_second=200)
+    batch_units = 5 * 50
+
+    started_at = time.monotonic()
+    for _ in range(2):
+        scheduler.execute("messages.get", mocker.Mock(), units=batch_units)
+    elapsed = time.monotonic() - started_at
+
+    # The first batch leaves the bucket 50 units in debt, which the second waits off
+    assert 0.2 <= elapsed < 1
+    assert scheduler.get_stats().quota_units == 500
+
+
+def test_execute_does_not_block_on_a_full_batch_at_the_default_quota(mocker):
+    scheduler = AdaptiveScheduler()
+
+    result = scheduler.execute(
+        "messages.get", mocker.Mock(return_value="batch"), units=5 * 100
+    )
+
+    assert result == "batch"
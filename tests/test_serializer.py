@@ -0,0 +1,174 @@
+import csv
+import gzip
+import json
+
+import pytest
+
+from gmail_fisher.data.models import BankExpense, BoltFoodExpense, UberEatsExpense
+from gmail_fisher.data.serializer import (
+    Compression,
+    OutputFormat,
+    id_index_path,
+    infer_output_format,
+    merge_expenses_into_file,
+    serialize_expenses,
+)
+
+
+@pytest.fixture
+def expenses():
+    return [
+        UberEatsExpense(id="1", restaurant="Udon", total=9.5, date="2021-04-27"),
+        BoltFoodExpense(id="2", restaurant="Chickinho", total=9.73, date="2021-06-10"),
+    ]
+
+
+@pytest.mark.parametrize(
+    "filename, expected",
+    [
+        ("expenses.json", (OutputFormat.JSON, None)),
+        ("expenses.jsonl.gz", (OutputFormat.JSONL, Compression.GZIP)),
+        ("expenses.csv.zst", (OutputFormat.CSV, Compression.ZSTD)),
+        ("expenses.parquet", (OutputFormat.PARQUET, None)),
+        ("expenses", (OutputFormat.JSON, None)),
+    ],
+)
+def test_infer_output_format(tmp_path, filename, expected):
+    assert infer_output_format(tmp_path / filename) == expected
+
+
+def test_json_output_matches_pretty_printed_array(tmp_path, expenses):
+    output_path = tmp_path / "output" / "expenses.json"
+
+    assert serialize_expenses(expenses, output_path) == 2
+
+    assert output_path.read_text() == json.dumps(
+        [expenses[1].__dict__, expenses[0].__dict__], ensure_ascii=False, indent=4
+    )
+
+
+def test_json_output_of_no_expenses(tmp_path):
+    output_path = tmp_path / "expenses.json"
+
+    serialize_expenses([], output_path)
+
+    assert json.loads(output_path.read_text()) == []
+
+
+def test_gzip_json_lines_output(tmp_path, expenses):
+    output_path = tmp_path / "expenses.jsonl.gz"
+
+    serialize_expenses(iter(expenses), output_path)
+
+    with gzip.open(output_path, "rt") as output:
+        assert [json.loads(line)["id"] for line in output] == ["2", "1"]
+
+
+def test_csv_output(tmp_path, expenses):
+    output_path = tmp_path / "expenses.csv"
+
+    serialize_expenses(expenses, output_path)
+
+    with open(output_path, newline="") as output:
+        rows = list(csv.DictReader(output))
+    assert [(row["id"], row["restaurant"]) for row in rows] == [
+        ("2", "Chickinho"),
+        ("1", "Udon"),
+    ]
+
+
+def test_failed_export_keeps_previous_output(tmp_path, expenses):
+    output_path = tmp_path / "expenses.json"
+    output_path.write_text("previous")
+
+    with pytest.raises(RuntimeError):
+        serialize_expenses(expenses, output_path, compression="lz4")
+
+    assert output_path.read_text() == "previous"
+    assert list(tmp_path.iterdir()) == [output_path]
+
+
+def test_parquet_output(tmp_path, expenses):
+    parquet = pytest.importorskip("pyarrow.parquet")
+    output_path = tmp_path / "expenses.parquet"
+
+    serialize_expenses(expenses, output_path)
+
+    assert parquet.read_table(output_path).column("id").to_pylist() == ["2", "1"]
+
+
+def test_merge_inserts_only_new_expenses_in_date_order(tmp_path, expenses):
+    output_path = tmp_path / "expenses.jsonl"
+    serialize_expenses(expenses, output_path)
+    new_expense = UberEatsExpense(
+        id="3", restaurant="Udon", total=8.0, date="2021-05-01"
+    )
+
+    assert merge_expenses_into_file(expenses + [new_expense], output_path) == 1
+
+    with open(output_path) as output:
+        assert [json.loads(line)["id"] for line in output] == ["2", "3", "1"]
+    assert id_index_path(output_path).read_text().split() == ["1", "2", "3"]
+
+
+def test_merge_without_new_expenses_leaves_export_untouched(tmp_path, expenses):
+    output_path = tmp_path / "expenses.json"
+    merge_expenses_into_file(expenses, output_path)
+    output_path.write_text("untouched")
+
+    assert merge_expenses_into_file(expenses, output_path) == 0
+
+    assert output_path.read_text() == "untouched"
+
+
+def test_merge_reads_ids_from_export_without_index(tmp_path, expenses):
+    output_path = tmp_path / "expenses.csv.gz"
+    serialize_expenses(expenses[:1], output_path)
+    id_index_path(output_path).unlink()
+
+    assert merge_expenses_into_file(expenses, output_path) == 1
+
+    with gzip.open(output_path, "rt", newline="") as output:
+        assert [row["id"] for row in csv.DictReader(output)] == ["2", "1"]
+
+
+def test_merge_after_full_export_does_not_duplicate_expenses(tmp_path, expenses):
+    output_path = tmp_path / "expenses.jsonl"
+    merge_expenses_into_file(expenses[:1], output_path)
+    serialize_expenses(expenses, output_path)
+
+    assert merge_expenses_into_file(expenses, output_path) == 0
+
+    with open(output_path) as output:
+        assert [json.loads(line)["id"] for line in output] == ["2", "1"]
+    assert id_index_path(output_path).read_text().split() == ["1", "2"]
+
+
+def statement_line(content_hash: str, index: int) -> BankExpense:
+    return BankExpense(
+        id="00123",
+        description="COMPRA CUF",
+        total_euros="-12,50",
+        date=f"2021-0{index + 1}-01",
+        statement_line=f"{content_hash}:{index}",
+    )
+
+
+@pytest.mark.parametrize("keep_index", [True, False])
+def test_merge_statements_sharing_an_id(tmp_path, keep_index):
+    output_path = tmp_path / "bank_expenses.csv"
+    march = [statement_line("a" * 64, 0), statement_line("a" * 64, 1)]
+    april = [statement_line("b" * 64, 0)]
+    merge_expenses_into_file(march, output_path)
+    if not keep_index:
+        id_index_path(output_path).unlink()
+
+    assert merge_expenses_into_file(march + april, output_path) == 1
+    assert merge_expenses_into_file(march + april, output_path) == 0
+
+    with open(output_path, newline="") as output:
+        assert [row["statement_line"] for row in csv.DictReader(output)] == [
+            f"{'a' * 64}:1",
+            f"{'a' * 64}:0",
+            f"{'b' * 64}:0",
+        ]
@@ -0,0 +1,51 @@
+import pytest
+
+from gmail_fisher.data.models import UberEatsExpense
+from gmail_fisher.data.s3_uploader import S3BucketUploader, UploadReport, UploadStatus
+from gmail_fisher.services.exports import export_and_upload_expenses
+
+
+@pytest.fixture
+def expenses():
+    return [UberEatsExpense(id="1", restaurant="Udon", total=9.5, date="2021-04-27")]
+
+
+@pytest.fixture(autouse=True)
+def uploader_init(mocker):
+    return mocker.patch.object(S3BucketUploader, "__init__", return_value=None)
+
+
+def test_export_raises_on_failed_upload(mocker, tmp_path, expenses):
+    mocker.patch.object(S3BucketUploader, "upload", return_value=UploadStatus.FAILED)
+
+    with pytest.raises(RuntimeError):
+        export_and_upload_expenses(
+            expenses, tmp_path / "food.json", "Uber Eats", upload_s3=True
+        )
+
+    assert (tmp_path / "food.json").exists()
+
+
+def test_export_raises_on_failed_partition_upload(mocker, tmp_path, expenses):
+    mocker.patch.object(
+        S3BucketUploader,
+        "upload_many",
+        return_value=UploadReport(failed=["food/service=uber-eats/part.jsonl"]),
+    )
+
+    with pytest.raises(RuntimeError):
+        export_and_upload_expenses(
+            expenses, tmp_path / "food", "Uber Eats", upload_s3=True, partitioned=True
+        )
+
+
+def test_export_succeeds_when_uploads_succeed(mocker, tmp_path, expenses):
+    upload = mocker.patch.object(
+        S3BucketUploader, "upload", return_value=UploadStatus.SKIPPED
+    )
+
+    export_and_upload_expenses(
+        expenses, tmp_path / "food.json", "Uber Eats", upload_s3=True
+    )
+
+    upload.assert_called_once_with(filepath=tmp_path / "food.json", key="food.json")
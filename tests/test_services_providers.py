@@ -0,0 +1,82 @@
+import threading
+
+from gmail_fisher.data.dedup_index import DedupIndex
+from gmail_fisher.data.models import GmailMessage
+from gmail_fisher.parsers.food import BoltFoodParser
+from gmail_fisher.parsers.multiprocess import parse_expenses_in_processes
+from gmail_fisher.services.providers import fetch_expenses_from_providers
+
+
+def fake_parser(name: str, barrier: threading.Barrier):
+    class FakeParser:
+        header = name
+
+        @classmethod
+        def fetch_messages(cls):
+            # Fails with BrokenBarrierError unless both providers fetch at the same time
+            barrier.wait(timeout=5)
+            return iter([GmailMessage(id=name, subject=name, date="Wed, 28 Oct 2020")])
+
+        @classmethod
+        def iter_expenses_from_messages(cls, gmail_messages):
+            return (f"{message.id} expense" for message in gmail_messages)
+
+        @classmethod
+        def drop_duplicates(cls, expenses):
+            return expenses
+
+    return FakeParser
+
+
+def test_fetch_expenses_from_providers_fetches_concurrently():
+    barrier = threading.Barrier(2)
+
+    expenses = fetch_expenses_from_providers(
+        [fake_parser("Bolt", barrier), fake_parser("Uber", barrier)]
+    )
+
+    assert sorted(expenses) == ["Bolt expense", "Uber expense"]
+
+
+def test_parse_expenses_in_processes_matches_in_process_parsing(
+    mocker, tmp_path, bolt_food_messages
+):
+    index = DedupIndex(db_path=tmp_path / "dedup_index.sqlite3")
+    mocker.patch.object(DedupIndex, "get_instance", return_value=index)
+    expected = BoltFoodParser.parse_expenses_from_messages(bolt_food_messages)
+
+    expenses = list(
+        parse_expenses_in_processes(
+            BoltFoodParser, bolt_food_messages, workers=2, chunk_size=1, min_messages=0
+        )
+    )
+
+    assert expenses == expected
+
+
+def test_fetch_expenses_from_providers_parses_messages_as_they_stream():
+    first_parsed = threading.Event()
+
+    class StreamingParser:
+        header = "Bolt"
+
+        @classmethod
+        def fetch_messages(cls):
+            yield GmailMessage(id="first", subject="first", date="Wed, 28 Oct 2020")
+            # Only completes if the first message is parsed before the stream ends
+            assert first_parsed.wait(timeout=5)
+            yield GmailMessage(id="second", subject="second", date="Wed, 28 Oct 2020")
+
+        @classmethod
+        def iter_expenses_from_messages(cls, gmail_messages):
+            for message in gmail_messages:
+                first_parsed.set()
+                yield f"{message.id} expense"
+
+        @classmethod
+        def drop_duplicates(cls, expenses):
+            return expenses
+
+    expenses = fetch_expenses_from_providers([StreamingParser])
+
+    assert expenses == ["first expense", "second expense"]
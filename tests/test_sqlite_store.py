@@ -0,0 +1,49 @@
+from pathlib import Path
+
+from gmail_fisher.data.sqlite_store import (
+    QUERY_CHUNK_SIZE,
+    SQLiteStore,
+    iter_query_chunks,
+)
+
+
+class NotesStore(SQLiteStore):
+    schema = ("CREATE TABLE IF NOT EXISTS notes (note TEXT NOT NULL)",)
+
+    def __init__(self, db_path: Path = Path("cache/notes.sqlite3")):
+        super().__init__(db_path)
+
+
+class TagsStore(NotesStore):
+    pass
+
+
+def test_store_creates_its_schema(tmp_path):
+    store = NotesStore(db_path=tmp_path / "nested" / "notes.sqlite3")
+
+    with store.lock, store.connection:
+        store.connection.execute("INSERT INTO notes (note) VALUES ('hello')")
+
+    reopened = NotesStore(db_path=tmp_path / "nested" / "notes.sqlite3")
+    assert reopened.connection.execute("SELECT note FROM notes").fetchall() == [
+        ("hello",)
+    ]
+
+
+def test_get_instance_is_per_store(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    notes = NotesStore.get_instance()
+
+    assert NotesStore.get_instance() is notes
+    assert isinstance(TagsStore.get_instance(), TagsStore)
+    assert TagsStore.get_instance() is not notes
+
+
+def test_iter_query_chunks():
+    values = [str(value) for value in range(QUERY_CHUNK_SIZE * 2 + 1)]
+
+    chunks = list(iter_query_chunks(values))
+
+    assert [len(chunk) for chunk in chunks] == [QUERY_CHUNK_SIZE, QUERY_CHUNK_SIZE, 1]
+    assert [value for chunk in chunks for value in chunk] == values